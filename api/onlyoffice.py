@@ -8,6 +8,9 @@ import httpx
 import json
 import os
 import tempfile
+import base64
+import hashlib
+import hmac
 from fastapi import (APIRouter, Depends, HTTPException, Request, WebSocket,
                     Form,status)
 from fastapi.responses import (HTMLResponse, Response, FileResponse, JSONResponse, RedirectResponse,
@@ -16,13 +19,102 @@ from loguru import logger
 from config import settings
 from core import app_state
 from utils.utils import get_host_ipv6_addr
-import jwt # 使用 pyjwt
 from core.auth import get_current_user, get_current_verified_user, verify_active_session
 
 from core.data_model import DocType
 
 router = APIRouter()
 
+# HS256 JWT 的头部与密钥在运行期间不变：头部段预先编码，HMAC 对象预先载入密钥，
+# 签名时只需 copy() 后更新签名输入。hashlib 走 OpenSSL 后端，CPU 支持时自动使用 SHA 指令扩展。
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b'=')
+_JWT_HMAC_PROTO = hmac.new(settings.ONLYOFFICE_JWT_SECRET.get_secret_value().encode(), digestmod=hashlib.sha256)
+
+# 编辑器页面模板，只在导入时构建一次；字面量花括号已转义为 {{ }}
+EDITOR_HTML_TEMPLATE = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>OnlyOffice - {title}</title>
+        <meta charset="utf-8">
+        <script type="text/javascript" src="http://[{host}]:8080/web-apps/apps/api/documents/api.js"></script>
+        <style>
+            html, body {{ margin: 0; padding: 0; height: 100%; overflow: hidden; }}
+            #placeholder {{ width: 100%; height: 100%; }}
+        </style>
+    </head>
+    <body>
+        <div id="placeholder"></div>
+        <script type="text/javascript">
+            var config = {config_json};
+            function onRequestClose() {{
+                docEditor.destroyEditor();
+                document.getElementById("placeholder").innerHTML =
+                "<div style='text-align:center;padding-top:40px;font-size:20px;color:#666;'>📄 文档已关闭</div>";
+            }}
+
+            config.events = {{
+                onRequestClose: onRequestClose
+            }};
+            var docEditor = new DocsAPI.DocEditor("placeholder", config);
+        </script>
+    </body>
+    </html>
+    """
+
+
+def _build_editor_config(file_ext: str, file_key: str, title: str, token: str,
+                         document_type: str, user_id: str, user: str) -> dict:
+    """
+    构建 OnlyOffice 编辑器配置 (不含 token)。
+    """
+    return {
+        "document": {
+            "fileType": file_ext,
+            "key": file_key,  # 使用共享的 file_key
+            "title": title,
+            "url": f"http://host.docker.internal:8888/download/{token}/{title}",
+            "permissions": {
+                "edit": True,
+                "download": True,
+                "comment": True, # 允许多人评论
+            }
+        },
+        "documentType": document_type,
+        "editorConfig": {
+            "callbackUrl": "http://host.docker.internal:8888/onlyoffice/callback",
+            "user": {
+                "id": user_id,  # 使用唯一的 user_id
+                "name": user
+            },
+            "customization": {
+                "autosave": True,
+                "forcesave": True, # 强制保存以触发回调
+                "close": {
+                    "visible": True,
+                    "text": "关闭文档"
+                }
+            },
+            "lang": 'zh-CN'
+        },
+        "events": {
+            "onRequestClose": "function() { window.close(); }"
+        }
+    }
+
+
+def _generate_token(config: dict) -> str:
+    """
+    为编辑器配置生成 HS256 JWT 令牌。
+    """
+    payload_b64 = base64.urlsafe_b64encode(json.dumps(config, separators=(',', ':')).encode()).rstrip(b'=')
+    signing_input = _JWT_HEADER_B64 + b'.' + payload_b64
+    h = _JWT_HMAC_PROTO.copy()
+    h.update(signing_input)
+    signature_b64 = base64.urlsafe_b64encode(h.digest()).rstrip(b'=')
+    return (signing_input + b'.' + signature_b64).decode()
+
+
 # 主页面：嵌入 OnlyOffice 编辑器
 @router.get("/onlyoffice/editor", response_class=HTMLResponse)
 async def open_document(
@@ -80,80 +172,20 @@ async def open_document(
 
         logger.info(f"OnlyOffice协同配置: user='{user}', user_id='{user_id}', file_key='{file_key}', title='{just_the_filename}'")
 
-        # 2. 构建OnlyOffice配置
-        ONLYOFFICE_SECRET = settings.ONLYOFFICE_JWT_SECRET.get_secret_value()
-        final_js_config = {
-            "document": {
-                "fileType": file_ext,
-                "key": file_key,  # 使用共享的 file_key
-                "title": just_the_filename,
-                "url": f"http://host.docker.internal:8888/download/{token}/{just_the_filename}",
-                "permissions": {
-                    "edit": True,
-                    "download": True,
-                    "comment": True, # 允许多人评论
-                }
-            },
-            "documentType": document_type,
-            "editorConfig": {
-                "callbackUrl": "http://host.docker.internal:8888/onlyoffice/callback",
-                "user": {
-                    "id": user_id,  # 使用唯一的 user_id
-                    "name": user
-                },
-                "customization": {
-                    "autosave": True,
-                    "forcesave": True, # 强制保存以触发回调
-                    "close": {
-                        "visible": True,
-                        "text": "关闭文档"
-                    }
-                },
-                "lang": 'zh-CN'
-            },
-            "events": {
-                "onRequestClose": "function() { window.close(); }"
-            }
-        }
-        # 3. 生成JWT令牌
-        jwt_token = jwt.encode(final_js_config, ONLYOFFICE_SECRET, algorithm="HS256")
-        final_js_config['token'] = jwt_token
+        # 2. 构建OnlyOffice配置并签名
+        final_js_config = _build_editor_config(file_ext, file_key, just_the_filename, token, document_type, user_id, user)
+        final_js_config['token'] = _generate_token(final_js_config)
 
     else:
         logger.error(f"无效的下载token '{token}' 或文件路径 '{filepath}'")
         return HTMLResponse(f"错误: 无效的token或文件路径", status_code=400)
 
     #  注意端口号为8080
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>OnlyOffice - {filepath}</title>
-        <meta charset="utf-8">
-        <script type="text/javascript" src="http://[{get_host_ipv6_addr()}]:8080/web-apps/apps/api/documents/api.js"></script>
-        <style>
-            html, body {{ margin: 0; padding: 0; height: 100%; overflow: hidden; }}
-            #placeholder {{ width: 100%; height: 100%; }}
-        </style>
-    </head>
-    <body>
-        <div id="placeholder"></div>
-        <script type="text/javascript">
-            var config = {json.dumps(final_js_config)};
-            function onRequestClose() {{
-                docEditor.destroyEditor();
-                document.getElementById("placeholder").innerHTML =
-                "<div style='text-align:center;padding-top:40px;font-size:20px;color:#666;'>📄 文档已关闭</div>";
-            }}
-
-            config.events = {{
-                onRequestClose: onRequestClose
-            }};
-            var docEditor = new DocsAPI.DocEditor("placeholder", config);
-        </script>
-    </body>
-    </html>
-    """
+    html = EDITOR_HTML_TEMPLATE.format(
+        title=filepath,
+        host=get_host_ipv6_addr(),
+        config_json=json.dumps(final_js_config, separators=(',', ':'))
+    )
     return HTMLResponse(content=html)
 
 
@@ -3,6 +3,7 @@ import urllib.parse
 import time
 import uuid
 import os
+import stat
 from typing import Optional, List, cast, Union
 from pathlib import Path
 from urllib.parse import quote
@@ -11,6 +12,7 @@ import httpx
 import json
 import tempfile
 import mimetypes
+from email.utils import parsedate_to_datetime
 from fastapi import (APIRouter, Depends, HTTPException, Request, WebSocket,
                     Form,status)
 from fastapi.responses import (HTMLResponse, Response, FileResponse, JSONResponse, RedirectResponse,
@@ -19,6 +21,8 @@ from fastapi.responses import (HTMLResponse, Response, FileResponse, JSONRespons
 
 from loguru import logger
 from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
 from starlette.websockets import WebSocketState
 
 from config import settings
@@ -40,6 +44,29 @@ class ProjectSearchRequest(BaseModel):
 router = APIRouter()
 
 
+def _is_not_modified(response_headers: Headers, request_headers: Headers) -> bool:
+    """
+    根据 If-None-Match / If-Modified-Since 判断客户端缓存是否仍然有效。
+    If-None-Match 按 RFC 9110 弱比较：忽略 W/ 前缀，"*" 匹配任意已存在的文件；
+    提供了 If-None-Match 时不再看 If-Modified-Since。
+    """
+    if if_none_match := request_headers.get("if-none-match"):
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in tags:
+            return True
+        etag = response_headers.get("etag")
+        return etag is not None and etag.removeprefix("W/") in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    last_modified = response_headers.get("last-modified")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(last_modified)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
 # --- 登录/注销路由 ---
 @router.post("/login")
 async def login(request: Request):
@@ -181,7 +208,12 @@ async def download_file_via_token(token: str, filename_in_path: str, request: Re
     if filename_in_path != actual_filename_to_serve:
         logger.warning(f"下载请求中URL文件名 '{filename_in_path}' 与Token关联文件名 '{actual_filename_to_serve}' 不匹配。将使用Token关联文件名。")
     file_path_to_serve = Path(file_path_to_serve_str)
-    if not file_path_to_serve.exists() or not file_path_to_serve.is_file():
+    # 只做一次 stat：同时完成存在性/类型检查，结果再交给 FileResponse 复用，避免 exists+stat 的竞态
+    try:
+        file_stat = os.stat(file_path_to_serve)
+    except OSError:
+        file_stat = None
+    if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
         logger.error(f"Token '{token}' 指向的文件路径不存在或不是文件: '{file_path_to_serve_str}' (关联文件名: {actual_filename_to_serve})")
         raise HTTPException(status_code=404, detail="服务器上的文件未找到 (file missing on server)。")
 
@@ -190,8 +222,17 @@ async def download_file_via_token(token: str, filename_in_path: str, request: Re
     if not mime_type:
         mime_type = "application/octet-stream"  # 默认二进制流
 
+    # 传入 stat_result，由 FileResponse 生成 ETag/Last-Modified；
+    # OnlyOffice 等客户端重复拉取未修改的文件时直接返回 304，避免重新传输。
+    # 服务器支持 pathsend 扩展时 FileResponse 会交由服务器零拷贝发送。
+    response = FileResponse(file_path_to_serve, media_type=mime_type, filename=actual_filename_to_serve,
+                            stat_result=file_stat)
+    if _is_not_modified(response.headers, request.headers):
+        logger.debug(f"Token '{token}' 对应文件 '{actual_filename_to_serve}' 未修改，返回 304。")
+        return NotModifiedResponse(response.headers)
+
     logger.debug(f"Token '{token}' 验证成功。准备下载文件: '{actual_filename_to_serve}' (路径: '{file_path_to_serve_str}', URL文件名: '{filename_in_path}')")
-    return FileResponse(file_path_to_serve, media_type=mime_type, filename=actual_filename_to_serve)
+    return response
 
 
 @router.get("/spec_images/{image_name:path}")
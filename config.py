@@ -60,6 +60,7 @@ class Settings(BaseSettings):
     EMBEDDING_APIKEY: SecretStr
     EMBEDDING_MODEL_NAME: str = "bge-m3" # 默认为 'bge-m3'，但会被 .env 中的值覆盖
     EMBEDDING_AVAILABLE: bool = Field(default=False, init_var=False) # 设为 False，并且不由 __init__ 直接赋值
+    EMBEDDING_HEALTH_LIST_MODELS: bool = False # 健康检查成功时是否解析并记录模型列表 (默认只检查状态码)
 
     # --- 文件比较配置 (从 .env 中的 JSON 字符串加载) ---
     SHEET_COLUMN_CONFIG_JSON: str = Field(default='{}') # 表格列读取配置的 JSON 字符串
@@ -11,6 +11,7 @@ import uvicorn
 import httpx # 确保 httpx 已导入
 
 from utils.utils import calculate_md5, get_host_ipv6_addr, check_embedding_service_health
+from utils.http import close_shared_client
 from my_mcp_tools.mcp_tools import project_mcp # 导入新的 project_mcp
 
 from config import settings # 导入配置
@@ -69,7 +70,9 @@ async def combined_lifespan(app_instance: FastAPI):
             logger.info("HTTPX 客户端已创建并注册到 app_state。")
 
             # --- 执行嵌入服务健康检查 ---
-            settings.EMBEDDING_AVAILABLE = await check_embedding_service_health(app_state.http_client)
+            # 健康检查使用 utils.http 的共享客户端 (保持长连接)，应用关闭时释放
+            stack.push_async_callback(close_shared_client)
+            settings.EMBEDDING_AVAILABLE = await check_embedding_service_health()
             # logger.info(f"嵌入模型服务可用性: {settings.EMBEDDING_AVAILABLE}")
 
 
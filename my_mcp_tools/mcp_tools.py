@@ -411,62 +411,63 @@ async def diff_project_file(user:str, relative_file1_path: str,relative_file2_pa
             # success = True
             if all_sheet:
                 logger.info(f"对文件 '{relative_file1_path}' 和 '{relative_file2_path}' (类型: {document_type}) 进行所有Sheet的比较。")
-                sheet_names1_list = file_parser.get_xlsx_sheet_names(str(file_path1))
-                if not sheet_names1_list and os.path.exists(file_path1):
-                    logger.warning(f"无法从文件1 '{os.path.basename(file_path1)}' 读取工作表列表，或文件不包含工作表。")
-                sheet_names2_list = file_parser.get_xlsx_sheet_names(str(file_path2))
-                if not sheet_names2_list and os.path.exists(file_path2):
-                    logger.warning(f"无法从文件2 '{os.path.basename(file_path2)}' 读取工作表列表，或文件不包含工作表。")
-                sheet_names1 = set(sheet_names1_list if sheet_names1_list else []) # 防御None
-                sheet_names2 = set(sheet_names2_list if sheet_names2_list else []) # 防御None
-                common_sheets = sorted(list(sheet_names1.intersection(sheet_names2)))
-                sheets_only_in_file1 = sorted(list(sheet_names1 - sheet_names2))
-                sheets_only_in_file2 = sorted(list(sheet_names2 - sheet_names1))
-                comparison_results = [result_header]
-                # 文件内容错误，不包含任何sheet页
-                if not common_sheets and not sheets_only_in_file1 and not sheets_only_in_file2:
-                     comparison_results.append("两个Excel文件均不包含任何sheet页，或无法读取sheet列表。\n")
-                     tool_response = DiffFileResponse(content=f"N/A",hint="".join(comparison_results))
-                     return tool_response.model_dump_json()
-                     #return "".join(comparison_results)
-                # 存在同名的sheets
-                if common_sheets:
-                    comparison_results.append("--- 共同存在的Sheet比较结果 ---\n")
-                    for s_name in common_sheets:
-                        current_sheet_header = f"Sheet名称: {s_name}\n" + "-" * 30 + "\n"
-                        col_conf = settings.SHEET_COLUMN_CONFIG.get(s_name) if document_type == "概算表" else None
-                        try:
-                            content1_lines = file_parser.parse_xlsx_sheet_content(file_path1, s_name, col_conf)
-                            content2_lines = file_parser.parse_xlsx_sheet_content(file_path2, s_name, col_conf)
-                            if not content1_lines and not content2_lines:
-                                comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 无法解析文件1和文件2的此sheet内容，或内容均为空。\n\n"); continue
-                            elif not content1_lines:
-                                comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 无法解析文件1的此sheet内容，或内容为空。\n\n")
-                                continue
-                            elif not content2_lines:
-                                comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 无法解析文件2的此sheet内容，或内容为空。\n\n")
-                                continue
-                            diff = difflib.unified_diff(content1_lines, content2_lines, fromfile=f"{os.path.basename(file_path1)} ({s_name})", tofile=f"{os.path.basename(file_path2)} ({s_name})", lineterm='')
-                            diff_output = list(diff)
-                            if not diff_output:
-                                comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 内容一致。\n\n")
-                            else:
-                                filtered_diff = [line for line in diff_output if not (line.startswith("--- ") or line.startswith("+++ "))]
-                                comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 差异内容如下:\n" + "\n".join(filtered_diff) + "\n\n")
-                        except ValueError as ve:
-                            comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 比较错误 - {ve}\n\n")
-                        except Exception as e_comp:
-                            comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 比较时发生未知错误 - {e_comp}\n\n")
-                if sheets_only_in_file1:
-                    comparison_results.append(f"--- 仅存在于文件 '{os.path.basename(file_path1)}' 的Sheet ---\n")
-                    for s_name in sheets_only_in_file1:
-                        comparison_results.append(f"- {s_name}\n")
-                    comparison_results.append("\n")
-                if sheets_only_in_file2:
-                    comparison_results.append(f"--- 仅存在于文件 '{os.path.basename(file_path2)}' 的Sheet ---\n")
-                    for s_name in sheets_only_in_file2:
-                        comparison_results.append(f"- {s_name}\n")
-                    comparison_results.append("\n")
+                with file_parser.open_xlsx(file_path1) as xlsx_wb1, file_parser.open_xlsx(file_path2) as xlsx_wb2:
+                    sheet_names1_list = file_parser.get_xlsx_sheet_names_wb(xlsx_wb1)
+                    if not sheet_names1_list and os.path.exists(file_path1):
+                        logger.warning(f"无法从文件1 '{os.path.basename(file_path1)}' 读取工作表列表，或文件不包含工作表。")
+                    sheet_names2_list = file_parser.get_xlsx_sheet_names_wb(xlsx_wb2)
+                    if not sheet_names2_list and os.path.exists(file_path2):
+                        logger.warning(f"无法从文件2 '{os.path.basename(file_path2)}' 读取工作表列表，或文件不包含工作表。")
+                    sheet_names1 = set(sheet_names1_list if sheet_names1_list else []) # 防御None
+                    sheet_names2 = set(sheet_names2_list if sheet_names2_list else []) # 防御None
+                    common_sheets = sorted(list(sheet_names1.intersection(sheet_names2)))
+                    sheets_only_in_file1 = sorted(list(sheet_names1 - sheet_names2))
+                    sheets_only_in_file2 = sorted(list(sheet_names2 - sheet_names1))
+                    comparison_results = [result_header]
+                    # 文件内容错误，不包含任何sheet页
+                    if not common_sheets and not sheets_only_in_file1 and not sheets_only_in_file2:
+                         comparison_results.append("两个Excel文件均不包含任何sheet页，或无法读取sheet列表。\n")
+                         tool_response = DiffFileResponse(content=f"N/A",hint="".join(comparison_results))
+                         return tool_response.model_dump_json()
+                         #return "".join(comparison_results)
+                    # 存在同名的sheets
+                    if common_sheets:
+                        comparison_results.append("--- 共同存在的Sheet比较结果 ---\n")
+                        for s_name in common_sheets:
+                            current_sheet_header = f"Sheet名称: {s_name}\n" + "-" * 30 + "\n"
+                            col_conf = settings.SHEET_COLUMN_CONFIG.get(s_name) if document_type == "概算表" else None
+                            try:
+                                content1_lines = file_parser.parse_xlsx_sheet_content_wb(xlsx_wb1, s_name, col_conf)
+                                content2_lines = file_parser.parse_xlsx_sheet_content_wb(xlsx_wb2, s_name, col_conf)
+                                if not content1_lines and not content2_lines:
+                                    comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 无法解析文件1和文件2的此sheet内容，或内容均为空。\n\n"); continue
+                                elif not content1_lines:
+                                    comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 无法解析文件1的此sheet内容，或内容为空。\n\n")
+                                    continue
+                                elif not content2_lines:
+                                    comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 无法解析文件2的此sheet内容，或内容为空。\n\n")
+                                    continue
+                                diff = difflib.unified_diff(content1_lines, content2_lines, fromfile=f"{os.path.basename(file_path1)} ({s_name})", tofile=f"{os.path.basename(file_path2)} ({s_name})", lineterm='')
+                                diff_output = list(diff)
+                                if not diff_output:
+                                    comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 内容一致。\n\n")
+                                else:
+                                    filtered_diff = [line for line in diff_output if not (line.startswith("--- ") or line.startswith("+++ "))]
+                                    comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 差异内容如下:\n" + "\n".join(filtered_diff) + "\n\n")
+                            except ValueError as ve:
+                                comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 比较错误 - {ve}\n\n")
+                            except Exception as e_comp:
+                                comparison_results.append(f"{current_sheet_header}Sheet '{s_name}': 比较时发生未知错误 - {e_comp}\n\n")
+                    if sheets_only_in_file1:
+                        comparison_results.append(f"--- 仅存在于文件 '{os.path.basename(file_path1)}' 的Sheet ---\n")
+                        for s_name in sheets_only_in_file1:
+                            comparison_results.append(f"- {s_name}\n")
+                        comparison_results.append("\n")
+                    if sheets_only_in_file2:
+                        comparison_results.append(f"--- 仅存在于文件 '{os.path.basename(file_path2)}' 的Sheet ---\n")
+                        for s_name in sheets_only_in_file2:
+                            comparison_results.append(f"- {s_name}\n")
+                        comparison_results.append("\n")
                 # 成功，构建返回内容
                 result = "".join(comparison_results)
                 success = True
@@ -644,36 +645,37 @@ async def read_project_file(user:str, relative_file_path: str, file_category: st
 
     # --- 概算书文档 (Excel) ---
     if file_category == "概算书文档":
-        sheet_names_list = file_parser.get_xlsx_sheet_names(str(abs_file_path))
-        if not sheet_name:
-            if not sheet_names_list:
-                logger.warning(f"文件 '{relative_file_path}' 不包含任何工作表，或无法读取。")
-                response.content = f"读取文件 {relative_file_path} 失败: 文件不包含任何工作表，或无法读取。"
-                response.hint = "请检查文件是否为有效的Excel文件。"
-            else:
-                all_sheet_names = "\n".join(sheet_names_list)
-                logger.info(f"未指定表名， {relative_file_path} 中的Sheet名称: {sheet_names_list}，等待重试")
-                response.content = f"未指定表名，文件 {relative_file_path} 的sheets如下：\n{all_sheet_names}"
-                response.hint = "请指定表名重试。"
-        else:
-            if not sheet_names_list or sheet_name not in sheet_names_list:
-                available_sheets_str = "\n".join(sheet_names_list) if sheet_names_list else "无可用Sheet"
-                logger.warning(f"Sheet '{sheet_name}' 在文件 {relative_file_path} 中未找到。可用Sheets: {available_sheets_str}")
-                response.content = f"文件 {relative_file_path} 的sheet'{sheet_name}'未找到， 可用Sheets: {available_sheets_str}。"
-                response.hint = "请检查sheet_name或从可用列表中选择一个重试。"
+        with file_parser.open_xlsx(abs_file_path) as xlsx_wb: # sheet 名称与内容共用一次打开
+            sheet_names_list = file_parser.get_xlsx_sheet_names_wb(xlsx_wb)
+            if not sheet_name:
+                if not sheet_names_list:
+                    logger.warning(f"文件 '{relative_file_path}' 不包含任何工作表，或无法读取。")
+                    response.content = f"读取文件 {relative_file_path} 失败: 文件不包含任何工作表，或无法读取。"
+                    response.hint = "请检查文件是否为有效的Excel文件。"
+                else:
+                    all_sheet_names = "\n".join(sheet_names_list)
+                    logger.info(f"未指定表名， {relative_file_path} 中的Sheet名称: {sheet_names_list}，等待重试")
+                    response.content = f"未指定表名，文件 {relative_file_path} 的sheets如下：\n{all_sheet_names}"
+                    response.hint = "请指定表名重试。"
             else:
-                content_lines = file_parser.parse_xlsx_sheet_content(str(abs_file_path), sheet_name, column_config=None)
-                if not content_lines:
-                    logger.warning(f"无法从文件 '{relative_file_path}' 的 Sheet '{sheet_name}' 解析内容，或该Sheet为空。")
-                    response.content = f"无法从文件 '{relative_file_path}' 的 Sheet '{sheet_name}' 解析内容，或该Sheet为空。"
-                    response.hint = "请检查文件内容和格式。"
+                if not sheet_names_list or sheet_name not in sheet_names_list:
+                    available_sheets_str = "\n".join(sheet_names_list) if sheet_names_list else "无可用Sheet"
+                    logger.warning(f"Sheet '{sheet_name}' 在文件 {relative_file_path} 中未找到。可用Sheets: {available_sheets_str}")
+                    response.content = f"文件 {relative_file_path} 的sheet'{sheet_name}'未找到， 可用Sheets: {available_sheets_str}。"
+                    response.hint = "请检查sheet_name或从可用列表中选择一个重试。"
                 else:
-                    sheet_content = "\n".join(content_lines)
-                    preview_len = min(100, len(sheet_content))
-                    logger.info(f"从文件 {relative_file_path}成功读取 sheet:{sheet_name}（预览100字）:{sheet_content[0:preview_len]}")
-                    response.content = sheet_content
-                    response.hint = "已成功读取Sheet内容。内容较多，无需罗列。"
-                    success = True
+                    content_lines = file_parser.parse_xlsx_sheet_content_wb(xlsx_wb, sheet_name, column_config=None)
+                    if not content_lines:
+                        logger.warning(f"无法从文件 '{relative_file_path}' 的 Sheet '{sheet_name}' 解析内容，或该Sheet为空。")
+                        response.content = f"无法从文件 '{relative_file_path}' 的 Sheet '{sheet_name}' 解析内容，或该Sheet为空。"
+                        response.hint = "请检查文件内容和格式。"
+                    else:
+                        sheet_content = "\n".join(content_lines)
+                        preview_len = min(100, len(sheet_content))
+                        logger.info(f"从文件 {relative_file_path}成功读取 sheet:{sheet_name}（预览100字）:{sheet_content[0:preview_len]}")
+                        response.content = sheet_content
+                        response.hint = "已成功读取Sheet内容。内容较多，无需罗列。"
+                        success = True
 
     # --- 图纸图形文档 ---
     elif file_category == "图纸图形文档":
@@ -278,33 +278,44 @@ def inspect_metadata(db_path: Path, keyword: str):
     cursor = conn.cursor()
 
     print(f"检查数据库: {db_path}")
+    # 元数据不是合法 JSON 的记录单独列出，下面的查询会跳过它们
+    cursor.execute("""
+    SELECT relative_path
+    FROM indexed_files
+    WHERE document_type = '项目文件'
+      AND NOT json_valid(metadata)
+    """)
+    for (rel_path,) in cursor.fetchall():
+        print(f"[❌] 元数据无法解析: {rel_path}")
+
+    # 由 SQLite 的 json1 扩展完成过滤、取字段和组装 JSON，Python 侧只需一次 json.loads
     sql = """
-    SELECT relative_path, metadata
+    SELECT json_group_array(json_object(
+        'path', relative_path,
+        'name', json_extract(metadata, '$.project_name'),
+        'year', json_extract(metadata, '$.year'),
+        'metadata', json(metadata)
+    ))
     FROM indexed_files
     WHERE document_type = '项目文件'
+      AND json_valid(metadata)
+      AND json_extract(metadata, '$.project_name') <> ''
+      AND instr(json_extract(metadata, '$.project_name'), ?) > 0
     """
 
-    cursor.execute(sql)
-    rows = cursor.fetchall()
+    cursor.execute(sql, (keyword,))
+    row = cursor.fetchone()
+    matched = json.loads(row[0] if row and row[0] else "[]")
 
     matched_rows = []
 
-    for rel_path, metadata_json in rows:
-        try:
-            metadata = json.loads(metadata_json)
-        except json.JSONDecodeError:
-            print(f"[❌] 元数据无法解析: {rel_path}")
-            continue
-
-        project_name = metadata.get("project_name")
-        project_year = metadata.get("year")  # 或 "project_year"，看你实际字段名
-
-        if project_name and keyword in project_name:
-            print(f"\n[✅] 匹配文件: {rel_path}")
-            print(f"📄 项目名: {project_name}")
-            print(f"📆 年份: {project_year} ({type(project_year).__name__})")
-            print(f"📦 原始元数据: {metadata}")
-            matched_rows.append(rel_path)
+    for item in matched:
+        project_year = item["year"]  # 或 "project_year"，看你实际字段名
+        print(f"\n[✅] 匹配文件: {item['path']}")
+        print(f"📄 项目名: {item['name']}")
+        print(f"📆 年份: {project_year} ({type(project_year).__name__})")
+        print(f"📦 原始元数据: {item['metadata']}")
+        matched_rows.append(item["path"])
 
     if not matched_rows:
         print(f"\n[⚠️] 没有找到包含关键词 '{keyword}' 的记录")
@@ -0,0 +1,64 @@
+"""
+calamine 与 openpyxl 两条 XLSX 读取路径的输出一致性测试。
+
+运行: python -m pytest tests/file_parser_xlsx_test.py
+"""
+import datetime
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+openpyxl = pytest.importorskip("openpyxl")
+pytest.importorskip("python_calamine")
+
+from utils import file_parser
+
+
+def _build_workbook(path: Path) -> None:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "数据"
+    ws.append([1, 1.5, -3, 0, 0.1 + 0.2, 1e-07, 123456789012345, 9999999999999998])
+    ws.append([1e16, 1e20, 12345678901234567, -1e20])
+    ws.append([
+        datetime.datetime(2024, 1, 2),
+        datetime.datetime(2024, 1, 2, 13, 5, 7),
+        datetime.date(2024, 3, 4),
+        datetime.time(12, 30),
+        datetime.timedelta(hours=30),
+    ])
+    for col, (value, number_format) in enumerate(
+        [(45000, "yyyy-mm-dd"), (45000.5, "yyyy-mm-dd hh:mm"), (0.25, "0%")], start=1
+    ):
+        ws.cell(row=4, column=col, value=value).number_format = number_format
+    ws.append(["文本", True, None, "末列"])
+    wb.save(path)
+
+
+def _read(path: Path, column_config=None):
+    with file_parser.open_xlsx(path) as wb:
+        return file_parser.parse_xlsx_sheet_content_wb(wb, "数据", column_config)
+
+
+@pytest.mark.parametrize("column_config", [None, (2, None), (1, 6)])
+def test_calamine_matches_openpyxl(tmp_path, monkeypatch, column_config):
+    path = tmp_path / "types.xlsx"
+    _build_workbook(path)
+
+    calamine_lines = _read(path, column_config)
+    monkeypatch.setattr(file_parser, "CalamineWorkbook", None)
+    openpyxl_lines = _read(path, column_config)
+
+    assert calamine_lines == openpyxl_lines
+    assert calamine_lines
+
+
+def test_calamine_cell_str():
+    assert file_parser._calamine_cell_str(2.0) == "2"
+    assert file_parser._calamine_cell_str(1e20) == "1e+20"
+    assert file_parser._calamine_cell_str(1e16) == "1e+16"
+    assert file_parser._calamine_cell_str(datetime.date(2024, 1, 2)) == "2024-01-02 00:00:00"
+    assert file_parser._calamine_cell_str(None) == ""
@@ -6,19 +6,51 @@ OpenAI兼容API流式接口测试脚本 - 使用OpenAI官方客户端
 支持测试各种OpenAI兼容的API端点
 """
 
+import re
 import time
 import sys
+import importlib.util
 from typing import Iterator
+import httpx
 from openai import OpenAI
 
+_WORD_RE = re.compile(r"\S+")
+
 class StreamingAPITester:
     def __init__(self, base_url: str, api_key: str, model: str ="kimi-thinking-preview"):
         self.model = model
+        # 所有接口共用一个连接池，复用 TLS 会话；安装了 h2 时启用 HTTP/2 多路复用
+        self._http = httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=httpx.Timeout(60.0, read=None),
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16)
+        )
         self.client = OpenAI(
             api_key=api_key,
-            base_url=base_url
+            base_url=base_url,
+            http_client=self._http
         )
 
+    def close(self):
+        """释放底层HTTP连接池"""
+        self._http.close()
+
+    @staticmethod
+    def _print_stats(parts: list[str], chunk_count: int, start_time: float):
+        """打印流式响应的统计信息"""
+        duration = time.time() - start_time
+        full_response = "".join(parts)
+        # 逐个匹配计数，不生成 split() 的子串列表
+        word_count = sum(1 for _ in _WORD_RE.finditer(full_response))
+
+        print(f"\n\n📊 统计信息:")
+        print(f"   - 收到数据块: {chunk_count}")
+        print(f"   - 总字符数: {len(full_response)}")
+        print(f"   - 总字数: {word_count}")
+        print(f"   - 耗时: {duration:.2f}秒")
+        if duration > 0:
+            print(f"   - 平均速度: {len(full_response)/duration:.1f}字符/秒")
+
     def test_completion_stream(self, prompt: str, max_tokens: int = 500) -> Iterator[str]:
         """测试流式completion接口"""
         print(f"🤖 模型: {self.model}")
@@ -40,7 +72,7 @@ class StreamingAPITester:
 
             print("✅ 连接成功，开始接收流式数据...\n")
 
-            full_response = ""
+            parts: list[str] = []
             chunk_count = 0
             start_time = time.time()
 
@@ -55,7 +87,7 @@ class StreamingAPITester:
                     if hasattr(choice, 'text') and choice.text:
                         text = choice.text
                         print(text, end='', flush=True)
-                        full_response += text
+                        parts.append(text)
                         yield text
 
                     # 检查是否完成
@@ -63,16 +95,7 @@ class StreamingAPITester:
                         print(f"\n🎯 完成原因: {choice.finish_reason}")
                         break
 
-            end_time = time.time()
-            duration = end_time - start_time
-
-            print(f"\n\n📊 统计信息:")
-            print(f"   - 收到数据块: {chunk_count}")
-            print(f"   - 总字符数: {len(full_response)}")
-            print(f"   - 总字数: {len(full_response.split())}")
-            print(f"   - 耗时: {duration:.2f}秒")
-            if duration > 0:
-                print(f"   - 平均速度: {len(full_response)/duration:.1f}字符/秒")
+            self._print_stats(parts, chunk_count, start_time)
 
         except Exception as e:
             print(f"❌ 请求错误: {e}")
@@ -101,7 +124,7 @@ class StreamingAPITester:
 
             print("✅ 连接成功，开始接收流式数据...\n")
 
-            full_response = ""
+            parts: list[str] = []
             chunk_count = 0
             start_time = time.time()
 
@@ -117,7 +140,7 @@ class StreamingAPITester:
                         if hasattr(choice.delta, 'content') and choice.delta.content:
                             content = choice.delta.content
                             print(content, end='', flush=True)
-                            full_response += content
+                            parts.append(content)
                             yield content
 
                     # 检查是否完成
@@ -125,16 +148,7 @@ class StreamingAPITester:
                         print(f"\n🎯 完成原因: {choice.finish_reason}")
                         break
 
-            end_time = time.time()
-            duration = end_time - start_time
-
-            print(f"\n\n📊 统计信息:")
-            print(f"   - 收到数据块: {chunk_count}")
-            print(f"   - 总字符数: {len(full_response)}")
-            print(f"   - 总字数: {len(full_response.split())}")
-            print(f"   - 耗时: {duration:.2f}秒")
-            if duration > 0:
-                print(f"   - 平均速度: {len(full_response)/duration:.1f}字符/秒")
+            self._print_stats(parts, chunk_count, start_time)
 
         except Exception as e:
             print(f"❌ 请求错误: {e}")
@@ -168,6 +182,7 @@ def main():
     print("🤖 OpenAI客户端流式接口测试工具")
     print("="*50)
 
+    tester = None
     # 获取用户输入
     try:
         api_key="sk-7GUfyabVxWR9iTurMSCfd3Ln3aFF8DMgmOj8M2N40XLlXvEL"
@@ -243,6 +258,9 @@ def main():
         print("\n\n⏹️  用户中断测试")
     except Exception as e:
         print(f"\n❌ 程序错误: {e}")
+    finally:
+        if tester is not None:
+            tester.close()
 
 
 if __name__ == "__main__":
@@ -1,19 +1,118 @@
 # mcp_client_test.py
 import asyncio
+import functools
 import json
+import os
+import sys
 import traceback
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, NamedTuple, Optional
+import httpx
 from mcp.client.streamable_http import streamablehttp_client
 from mcp import ClientSession # Import ToolCallResult for type hinting if needed
 from mcp.types import CallToolResult, ListToolsResult
 
+try:
+    # 可选依赖：orjson 的解析/序列化速度是标准库 json 的数倍；未安装时回退到 json
+    import orjson
+except ImportError:
+    orjson = None
+
 # MCP服务器的URL
 SERVER_URL = "http://localhost:8888/mcp/mcp" # <--- 更新端口号
 
+def _render_files(parsed_json: dict) -> str:
+    text = parsed_json.get("hint", "找到以下文件:") + "\n"
+    if isinstance(parsed_json["files"], list):
+        for f_item in parsed_json["files"]:
+            if isinstance(f_item, dict) and "path" in f_item:
+                text += f"- 文件: {f_item['path']}"
+                if "similarity" in f_item:
+                    text += f" (相似度: {f_item['similarity']})"
+                text += "\n"
+    else: # For /ALL case where files is a string
+        text += parsed_json["files"] + "\n"
+    if "project_name" in parsed_json: # For query_project_files /ALL case
+        text += f"项目名称: {parsed_json['project_name']}\n"
+    return text
+
+def _render_content(parsed_json: dict) -> str:
+    text = parsed_json.get("hint", "文件内容:") + "\n"
+    text += f"文件路径: {parsed_json.get('file_path', 'N/A')}\n"
+    if "similarity" in parsed_json:
+        text += f"相似度: {parsed_json['similarity']}\n"
+    return text + "内容:\n" + parsed_json["content"]
+
+def _render_project(parsed_json: dict) -> str:
+    text = parsed_json.get("hint", "项目文件列表:") + "\n"
+    text += f"项目名称: {parsed_json['project_name']}\n"
+    return text + "文件列表:\n" + "\n".join(parsed_json["project_files"])
+
+def _render_error(parsed_json: dict) -> str:
+    return f"错误: {parsed_json['error']}"
+
+def _render_hint(parsed_json: dict) -> str: # Generic hint
+    return parsed_json["hint"]
+
+def _json_loads(text: str):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+def _render_json_dump(parsed_json) -> str:
+    if orjson is not None:
+        # orjson 直接输出 UTF-8，等价于 ensure_ascii=False；OPT_INDENT_2 与 indent=2 的排版一致
+        try:
+            return orjson.dumps(parsed_json, option=orjson.OPT_INDENT_2).decode()
+        except TypeError: # orjson.JSONEncodeError (如超出 64 位的整数)，交给标准库处理
+            pass
+    return json.dumps(parsed_json, indent=2, ensure_ascii=False)
+
+# JSON 响应结构 -> 渲染函数，按优先级排列 (与原 if/elif 链顺序一致)
+_SCHEMA_RENDERERS = (
+    (frozenset({"files"}), _render_files),
+    (frozenset({"content"}), _render_content),
+    (frozenset({"project_name", "project_files"}), _render_project),
+    (frozenset({"error"}), _render_error),
+    (frozenset({"hint"}), _render_hint),
+)
+_ALL_KNOWN_KEYS = frozenset().union(*(keys for keys, _ in _SCHEMA_RENDERERS))
+
+@functools.lru_cache(maxsize=64)
+def _resolve_renderer(known_keys: frozenset):
+    """按响应中出现的已知键集合确定渲染函数；同一结构只解析一次。"""
+    for keys, renderer in _SCHEMA_RENDERERS:
+        if keys <= known_keys:
+            return renderer
+    return _render_json_dump
+
+def _handle_str(content_item: str) -> str:
+    # 尝试解析为JSON，以处理 open_specification_files 等工具的结构化返回
+    try:
+        parsed_json = _json_loads(content_item)
+    except json.JSONDecodeError: # orjson.JSONDecodeError 是其子类
+        # 如果不是有效的JSON，则直接使用原始字符串
+        return content_item
+    if not isinstance(parsed_json, dict): # Not a dict, just dump it
+        return _render_json_dump(parsed_json)
+    known_keys = _ALL_KNOWN_KEYS.intersection(parsed_json)
+    if "files" in known_keys and not isinstance(parsed_json["files"], (list, str)):
+        known_keys = known_keys - {"files"}
+    return _resolve_renderer(known_keys)(parsed_json)
+
+def _handle_unknown(content_item) -> str:
+    error_msg = f"错误: 未能识别的响应内容类型: {type(content_item)}"
+    print(error_msg + f" 原始值: {repr(content_item)}")
+    return error_msg + f"\n请检查服务器返回的原始结构: {repr(content_item)}"
+
+_CONTENT_HANDLERS = {
+    str: _handle_str,
+    dict: _render_json_dump, # If result is JSON
+    list: _render_json_dump,
+}
+
 def display_tool_result(call_result: CallToolResult):
     """Helper function to display the result of a tool call."""
     print("\n--- 服务器响应 ---")
     if not call_result.isError and call_result.content:
-        server_response_text = ""
         content_to_parse = call_result.content
 
         # FastMCP often returns a list containing a single content item (e.g., TextContent)
@@ -23,53 +122,10 @@ def display_tool_result(call_result: CallToolResult):
             content_item = content_to_parse
 
         # 优先尝试从 content_item 中提取 text 属性
-        if hasattr(content_item, 'text'):
-            server_response_text = getattr(content_item, 'text', '')
-        elif isinstance(content_item, str):
-            # 尝试解析为JSON，以处理 open_specification_files 等工具的结构化返回
-            try:
-                parsed_json = json.loads(content_item)
-                if isinstance(parsed_json, dict):
-                    if "files" in parsed_json and (isinstance(parsed_json["files"], list) or isinstance(parsed_json["files"], str)):
-                        server_response_text += parsed_json.get("hint", "找到以下文件:") + "\n"
-                        if isinstance(parsed_json["files"], list):
-                            for f_item in parsed_json["files"]:
-                                if isinstance(f_item, dict) and "path" in f_item:
-                                    server_response_text += f"- 文件: {f_item['path']}"
-                                    if "similarity" in f_item:
-                                        server_response_text += f" (相似度: {f_item['similarity']})"
-                                    server_response_text += "\n"
-                        else: # For /ALL case where files is a string
-                            server_response_text += parsed_json["files"] + "\n"
-                        if "project_name" in parsed_json: # For query_project_files /ALL case
-                            server_response_text += f"项目名称: {parsed_json['project_name']}\n"
-                    elif "content" in parsed_json:
-                        server_response_text += parsed_json.get("hint", "文件内容:") + "\n"
-                        server_response_text += f"文件路径: {parsed_json.get('file_path', 'N/A')}\n"
-                        if "similarity" in parsed_json:
-                            server_response_text += f"相似度: {parsed_json['similarity']}\n"
-                        server_response_text += "内容:\n" + parsed_json["content"]
-                    elif "project_name" in parsed_json and "project_files" in parsed_json:
-                        server_response_text += parsed_json.get("hint", "项目文件列表:") + "\n"
-                        server_response_text += f"项目名称: {parsed_json['project_name']}\n"
-                        server_response_text += "文件列表:\n" + "\n".join(parsed_json["project_files"])
-                    elif "error" in parsed_json:
-                        server_response_text = f"错误: {parsed_json['error']}"
-                    elif "hint" in parsed_json: # Generic hint
-                        server_response_text = parsed_json["hint"]
-                    else:
-                        server_response_text = json.dumps(parsed_json, indent=2, ensure_ascii=False)
-                else: # Not a dict, just dump it
-                    server_response_text = json.dumps(parsed_json, indent=2, ensure_ascii=False)
-            except json.JSONDecodeError:
-                # 如果不是有效的JSON，则直接使用原始字符串
-                server_response_text = content_item
-        elif isinstance(content_item, dict) or isinstance(content_item, list): # If result is JSON
-            server_response_text = json.dumps(content_item, indent=2, ensure_ascii=False)
-        else:
-            error_msg = f"错误: 未能识别的响应内容类型: {type(content_item)}"
-            print(error_msg + f" 原始值: {repr(content_item)}")
-            server_response_text = error_msg + f"\n请检查服务器返回的原始结构: {repr(content_item)}"
+        try:
+            server_response_text = content_item.text
+        except AttributeError:
+            server_response_text = _CONTENT_HANDLERS.get(type(content_item), _handle_unknown)(content_item)
 
         print(server_response_text)
 
@@ -206,6 +262,108 @@ async def get_params_for_write_review_doc():
 
     return params
 
+class ParamSpec(NamedTuple):
+    """预编译后的单个参数：类型解析、提示语拼接都在编译时完成。"""
+    name: str
+    title: str
+    type_name: str
+    caster: Optional[Callable[[str], Any]] # None 表示该参数的 schema 定义无效
+    required: bool
+    default: Any
+    prompt: str
+
+def _bool_cast(value_str: str) -> bool:
+    return value_str.lower() in ('true', 't', 'yes', 'y', '1')
+
+def _json_cast(value_str: str, title: str):
+    # For "array" or "object", direct CLI input is complex. We ask for a JSON string.
+    try:
+        value = json.loads(value_str)
+        print(f"提示: 参数 '{title}' 作为JSON对象/数组解析。")
+        return value
+    except json.JSONDecodeError:
+        print(f"警告: 为 '{title}' 输入的不是有效的JSON字符串。将作为普通字符串处理: '{value_str}'")
+        return value_str # Fallback to string if JSON parse fails
+
+_TYPE_CASTERS = {
+    "integer": int,
+    "number": float, # JSON schema "number" can be float
+    "boolean": _bool_cast,
+    "string": str,
+}
+
+def _resolve_param_type(param_schema: dict) -> tuple[str, bool]:
+    """返回 (主类型, 是否因允许 null 而可选)。"""
+    # Determine type and if it's truly optional (e.g. due to 'type': 'null' in anyOf)
+    raw_param_type = param_schema.get('type')
+    actual_param_type = "string" # Default if type info is complex/missing
+    is_truly_optional = False
+
+    if isinstance(raw_param_type, str):
+        actual_param_type = raw_param_type
+    elif isinstance(raw_param_type, list): # Handles cases like "type": ["string", "null"]
+        if "null" in raw_param_type:
+            is_truly_optional = True
+        # Pick the first non-null type as the primary type for prompting
+        for t in raw_param_type:
+            if t != "null":
+                actual_param_type = t
+                break
+
+    # Check anyOf for null type, which also makes it optional
+    any_of_types = param_schema.get('anyOf')
+    if isinstance(any_of_types, list):
+        found_non_null_type_in_anyof = False
+        for type_option in any_of_types:
+            if isinstance(type_option, dict) and type_option.get('type') == 'null':
+                is_truly_optional = True
+            elif isinstance(type_option, dict) and 'type' in type_option and not found_non_null_type_in_anyof:
+                actual_param_type = type_option['type'] # Use first non-null type from anyOf
+                found_non_null_type_in_anyof = True
+        if not found_non_null_type_in_anyof and any_of_types: # if anyOf only had null or was malformed
+             actual_param_type = "string" # fallback
+
+    return actual_param_type, is_truly_optional
+
+@functools.lru_cache(maxsize=128)
+def _compile_schema(schema_json: str) -> tuple[ParamSpec, ...]:
+    """
+    将工具的 inputSchema 编译为 ParamSpec 序列，按 schema 的 JSON 文本缓存。
+    同一工具重复调用时不再重新解析 type/anyOf 或拼接提示语。
+    """
+    input_schema = json.loads(schema_json)
+    required_params_list = input_schema.get('required', [])
+    specs = []
+    for param_name, param_schema in input_schema['properties'].items():
+        if not isinstance(param_schema, dict):
+            specs.append(ParamSpec(param_name, param_name, "", None, False, None, ""))
+            continue
+
+        param_title = param_schema.get('title', param_name)
+        default_value = param_schema.get('default') # Might be None
+        actual_param_type, is_truly_optional = _resolve_param_type(param_schema)
+        is_required_by_schema = param_name in required_params_list and not is_truly_optional
+
+        if actual_param_type in ("array", "object"):
+            caster = functools.partial(_json_cast, title=param_title)
+        else: # Unknown type, treat as string
+            caster = _TYPE_CASTERS.get(actual_param_type, str)
+
+        prompt_parts = [f"  {param_title} ({actual_param_type})"]
+        if default_value is not None:
+            prompt_parts.append(f"(默认: {default_value})")
+
+        if is_required_by_schema:
+            prompt_parts.append("(必需): ")
+        else:
+            prompt_parts.append("(可选, 回车使用默认或跳过): ")
+
+        specs.append(ParamSpec(
+            param_name, param_title, actual_param_type, caster,
+            is_required_by_schema, default_value, " ".join(prompt_parts)
+        ))
+    return tuple(specs)
+
 async def get_params_dynamically(tool_definition):
     params = {}
     tool_name = tool_definition.name
@@ -227,185 +385,211 @@ async def get_params_dynamically(tool_definition):
         print(f"警告: 工具 '{tool_name}' 的 inputSchema 中没有 'properties' 定义。无法动态收集参数。")
         return params
 
-    required_params_list = input_schema.get('required', [])
-
-    for param_name, param_schema in properties.items():
-        if not isinstance(param_schema, dict):
-            print(f"警告: 参数 '{param_name}' 的 schema 定义无效，已跳过。")
-            continue
-
-        param_title = param_schema.get('title', param_name)
-        default_value = param_schema.get('default') # Might be None
-
-        # Determine type and if it's truly optional (e.g. due to 'type': 'null' in anyOf)
-        raw_param_type = param_schema.get('type')
-        actual_param_type = "string" # Default if type info is complex/missing
-        is_truly_optional = False
-
-        if isinstance(raw_param_type, str):
-            actual_param_type = raw_param_type
-        elif isinstance(raw_param_type, list): # Handles cases like "type": ["string", "null"]
-            if "null" in raw_param_type:
-                is_truly_optional = True
-            # Pick the first non-null type as the primary type for prompting
-            for t in raw_param_type:
-                if t != "null":
-                    actual_param_type = t
-                    break
-
-        # Check anyOf for null type, which also makes it optional
-        any_of_types = param_schema.get('anyOf')
-        if isinstance(any_of_types, list):
-            found_non_null_type_in_anyof = False
-            for type_option in any_of_types:
-                if isinstance(type_option, dict) and type_option.get('type') == 'null':
-                    is_truly_optional = True
-                elif isinstance(type_option, dict) and 'type' in type_option and not found_non_null_type_in_anyof:
-                    actual_param_type = type_option['type'] # Use first non-null type from anyOf
-                    found_non_null_type_in_anyof = True
-            if not found_non_null_type_in_anyof and any_of_types: # if anyOf only had null or was malformed
-                 actual_param_type = "string" # fallback
-
-        is_required_by_schema = param_name in required_params_list and not is_truly_optional
-
-        prompt_parts = [f"  {param_title} ({actual_param_type})"]
-        if default_value is not None:
-            prompt_parts.append(f"(默认: {default_value})")
-
-        if is_required_by_schema:
-            prompt_parts.append("(必需): ")
+    specs = _compile_schema(json.dumps(input_schema))
+    while True:
+        params = {}
+        for spec in specs:
+            if spec.caster is None:
+                print(f"警告: 参数 '{spec.name}' 的 schema 定义无效，已跳过。")
+                continue
+
+            value_str = input(spec.prompt).strip()
+
+            if value_str:
+                try:
+                    params[spec.name] = spec.caster(value_str)
+                except ValueError:
+                    print(f"警告: 为 '{spec.title}' 输入的值 '{value_str}' 类型不匹配 ({spec.type_name})，已忽略。")
+
+            elif spec.default is not None: # No input, but default exists
+                params[spec.name] = spec.default # Default value is already in its correct type from schema
+                print(f"提示: 参数 '{spec.title}' 使用默认值: {spec.default}")
+
+            elif spec.required: # No input, no default, but required
+                print(f"错误: 参数 '{spec.title}' 是必需的，但未提供值。请重新输入所有参数。")
+                print(f"为工具 '{tool_name}' 输入参数:")
+                break # Restart parameter collection for this tool
         else:
-            prompt_parts.append("(可选, 回车使用默认或跳过): ")
-
-        prompt = " ".join(prompt_parts)
-        value_str = input(prompt).strip()
-
-        final_value = None
-        use_value = False
-
-        if value_str:
-            use_value = True
-            try:
-                if actual_param_type == "integer":
-                    final_value = int(value_str)
-                elif actual_param_type == "number": # JSON schema "number" can be float
-                    final_value = float(value_str)
-                elif actual_param_type == "boolean":
-                    final_value = value_str.lower() in ['true', 't', 'yes', 'y', '1']
-                elif actual_param_type == "string":
-                    final_value = value_str
-                # For "array" or "object", direct CLI input is complex.
-                # We can ask for JSON string, or skip for now.
-                elif actual_param_type in ["array", "object"]:
-                    try:
-                        final_value = json.loads(value_str)
-                        print(f"提示: 参数 '{param_title}' 作为JSON对象/数组解析。")
-                    except json.JSONDecodeError:
-                        print(f"警告: 为 '{param_title}' 输入的不是有效的JSON字符串。将作为普通字符串处理: '{value_str}'")
-                        final_value = value_str # Fallback to string if JSON parse fails
-                else: # Unknown type, treat as string
-                    final_value = value_str
-            except ValueError:
-                print(f"警告: 为 '{param_title}' 输入的值 '{value_str}' 类型不匹配 ({actual_param_type})，已忽略。")
-                use_value = False # Do not use this malformed value
-
-        elif default_value is not None: # No input, but default exists
-            final_value = default_value # Default value is already in its correct type from schema
-            use_value = True
-            print(f"提示: 参数 '{param_title}' 使用默认值: {final_value}")
-
-        elif is_required_by_schema: # No input, no default, but required
-            print(f"错误: 参数 '{param_title}' 是必需的，但未提供值。请重新输入所有参数。")
-            return await get_params_dynamically(tool_definition) # Restart parameter collection for this tool
-
-        if use_value:
-            params[param_name] = final_value
-
-    return params
+            return params
+
+
+def _pooled_http_client_factory(headers=None, timeout=None, auth=None) -> httpx.AsyncClient:
+    """为 streamable HTTP 传输创建带 keep-alive 连接池的 httpx 客户端。"""
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout or httpx.Timeout(30.0, read=300.0),
+        auth=auth,
+        follow_redirects=True,
+        limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
+    )
+
+@asynccontextmanager
+async def run_session(url: str = SERVER_URL) -> AsyncIterator[ClientSession]:
+    """
+    建立到MCP服务器的连接并初始化 ClientSession。
+    在同一个 async with 中发起的所有工具调用共享这一条连接，避免重复的TCP/TLS握手。
+    """
+    async with streamablehttp_client(url, httpx_client_factory=_pooled_http_client_factory) as (read_stream, write_stream, _):
+        print("成功连接到服务器并获取读写流。")
+
+        async with ClientSession(read_stream, write_stream) as session:
+            print("ClientSession 已创建。正在初始化会话...")
+            await session.initialize()
+            print("会话已初始化。")
+            yield session
+
+    print("ClientSession 已关闭。")
+
+def _load_batch_calls(text: str) -> list[tuple[str, dict]]:
+    """
+    解析批处理输入：JSON数组，每项形如 {"tool": "工具名", "params": {...}}。
+    """
+    calls = []
+    for item in json.loads(text):
+        calls.append((item["tool"], item.get("params") or {}))
+    return calls
+
+def _call_result_text(call_result: CallToolResult) -> str:
+    """提取工具调用结果中的文本内容。"""
+    return "\n".join(getattr(item, "text", repr(item)) for item in call_result.content or [])
+
+async def batch_call(
+    session: ClientSession,
+    calls: list[tuple[str, dict]],
+    max_concurrent: int = 8,
+    stop_on_error: bool = False
+) -> list[dict]:
+    """
+    并发执行相互独立的工具调用，用信号量限制同时在途的请求数。
+    stop_on_error=True 时，任一调用失败即取消其余尚未完成的调用。
+    返回与 calls 顺序一致的汇总结果列表。
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _call(tool_name: str, params: dict) -> CallToolResult:
+        async with semaphore:
+            call_result = await session.call_tool(tool_name, params)
+        if stop_on_error and call_result.isError:
+            raise RuntimeError(_call_result_text(call_result))
+        return call_result
+
+    tasks = [asyncio.create_task(_call(tool_name, params)) for tool_name, params in calls]
+    if stop_on_error and tasks:
+        _, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    summary = []
+    for (tool_name, params), result in zip(calls, results):
+        entry: dict = {"tool": tool_name, "params": params}
+        if isinstance(result, asyncio.CancelledError):
+            entry["status"] = "cancelled"
+        elif isinstance(result, BaseException):
+            entry["status"] = "error"
+            entry["result"] = str(result)
+        else:
+            entry["status"] = "error" if result.isError else "ok"
+            entry["result"] = _call_result_text(result)
+        summary.append(entry)
+    return summary
 
+async def run_batch(session: ClientSession, calls: list[tuple[str, dict]], stop_on_error: bool = False):
+    """在同一个会话中并发执行批处理中的工具调用，并输出一份汇总的JSON结果。"""
+    print(f"\n批量调用 {len(calls)} 个工具 (stop_on_error={stop_on_error})...")
+    summary = await batch_call(session, calls, stop_on_error=stop_on_error)
+    print(_render_json_dump(summary))
 
 async def main():
     print(f"交互式MCP客户端启动，目标服务器: {SERVER_URL}")
     print("按 Ctrl+C 退出。")
 
     try:
-        async with streamablehttp_client(SERVER_URL) as (read_stream, write_stream, _):
-            print("成功连接到服务器并获取读写流。")
-
-            async with ClientSession(read_stream, write_stream) as session:
-                print("ClientSession 已创建。正在初始化会话...")
-                await session.initialize()
-                print("会话已初始化。")
-
-                result = await session.list_tools()
-                if not result:
-                    print("错误: 未能从服务器获取工具列表。")
-                    return
-
-                #tool_list = list(session.tools.keys())
-                tool_list = result.tools
-
-                while True:
-                    print("\n--- 可用工具 ---")
-                    for i, tool in enumerate(tool_list):
-                        print(f"{i + 1}. {tool.name}")
-                    print("0. 退出")
-
-                    try:
-                        choice_str = input("请选择要测试的工具编号: ").strip()
-                        if not choice_str.isdigit():
-                            print("无效输入，请输入数字。")
+        async with run_session(SERVER_URL) as session:
+            if os.environ.get("MCP_BATCH") == "1":
+                # 批处理模式：所有调用复用同一个会话/连接
+                await run_batch(session, _load_batch_calls(sys.stdin.read()),
+                                stop_on_error="--stop-on-error" in sys.argv[1:])
+                return
+
+            result = await session.list_tools()
+            if not result:
+                print("错误: 未能从服务器获取工具列表。")
+                return
+
+            #tool_list = list(session.tools.keys())
+            tool_list = result.tools
+
+            while True:
+                print("\n--- 可用工具 ---")
+                for i, tool in enumerate(tool_list):
+                    print(f"{i + 1}. {tool.name}")
+                print("/BATCH 文件.json - 批量并发调用 (JSON数组: [{\"tool\": ..., \"params\": {...}}])")
+                print("0. 退出")
+
+                try:
+                    choice_str = input("请选择要测试的工具编号 (或 /BATCH 文件.json [--stop-on-error]): ").strip()
+                    if choice_str.upper().startswith("/BATCH"):
+                        batch_args = choice_str.split()[1:]
+                        batch_files = [arg for arg in batch_args if not arg.startswith("--")]
+                        if len(batch_files) != 1:
+                            print("用法: /BATCH 文件.json [--stop-on-error]")
+                            continue
+                        with open(batch_files[0], "r", encoding="utf-8") as f:
+                            calls = _load_batch_calls(f.read())
+                        await run_batch(session, calls, stop_on_error="--stop-on-error" in batch_args)
+                        continue
+                    if not choice_str.isdigit():
+                        print("无效输入，请输入数字。")
+                        continue
+
+                    choice = int(choice_str)
+
+                    if choice == 0:
+                        print("正在退出...")
+                        break
+
+                    if 1 <= choice <= len(tool_list):
+                        selected_tool_name = tool_list[choice - 1].name
+                        print(f"\n--- 测试工具: {selected_tool_name} ---")
+
+                        params = {}
+                        tool_definition = tool_list[choice - 1]
+
+                        if selected_tool_name == "query_specification_knowledge_base":
+                            params = await get_params_for_query_specification_knowledge_base()
+                        elif selected_tool_name == "open_specification_files":
+                            params = await get_params_for_query_specification_files()
+                        elif selected_tool_name == "query_project_files":
+                            params = await get_params_two_stage_vector_query()
+                        elif selected_tool_name == "write_review_doc":
+                            params = await get_params_for_write_review_doc()
+                        elif tool_definition:
+                            params = await get_params_dynamically(tool_definition)
+                        else:
+                            print(f"错误: 未找到工具 '{selected_tool_name}' 的定义。")
                             continue
 
-                        choice = int(choice_str)
-
-                        if choice == 0:
-                            print("正在退出...")
-                            break
-
-                        if 1 <= choice <= len(tool_list):
-                            selected_tool_name = tool_list[choice - 1].name
-                            print(f"\n--- 测试工具: {selected_tool_name} ---")
-
-                            params = {}
-                            tool_definition = tool_list[choice - 1]
-
-                            if selected_tool_name == "query_specification_knowledge_base":
-                                params = await get_params_for_query_specification_knowledge_base()
-                            elif selected_tool_name == "open_specification_files":
-                                params = await get_params_for_query_specification_files()
-                            elif selected_tool_name == "query_project_files":
-                                params = await get_params_two_stage_vector_query()
-                            elif selected_tool_name == "write_review_doc":
-                                params = await get_params_for_write_review_doc()
-                            elif tool_definition:
-                                params = await get_params_dynamically(tool_definition)
-                            else:
-                                print(f"错误: 未找到工具 '{selected_tool_name}' 的定义。")
-                                continue
-
-                            print(f"\n正在使用参数调用 '{selected_tool_name}': {params}")
-                            call_result = await session.call_tool(selected_tool_name, params)
-                            display_tool_result(call_result)
+                        print(f"\n正在使用参数调用 '{selected_tool_name}': {params}")
+                        call_result = await session.call_tool(selected_tool_name, params)
+                        display_tool_result(call_result)
+
+                    else:
+                        print("无效的工具编号，请重新选择。")
+
+                except KeyboardInterrupt:
+                    print("\n捕获到 Ctrl+C，返回工具选择...")
+                    continue # Go back to tool selection
+                except EOFError:
+                    print("\n输入流结束，正在退出客户端...")
+                    return # Exit main loop
+                except Exception as e:
+                    print(f"\n在工具测试过程中发生意外错误: {e}")
+                    # Log full traceback for debugging if needed:
+                    # import traceback
+                    # traceback.print_exc()
+                    print("将返回工具选择菜单。")
 
-                        else:
-                            print("无效的工具编号，请重新选择。")
-
-                    except KeyboardInterrupt:
-                        print("\n捕获到 Ctrl+C，返回工具选择...")
-                        continue # Go back to tool selection
-                    except EOFError:
-                        print("\n输入流结束，正在退出客户端...")
-                        return # Exit main loop
-                    except Exception as e:
-                        print(f"\n在工具测试过程中发生意外错误: {e}")
-                        # Log full traceback for debugging if needed:
-                        # import traceback
-                        # traceback.print_exc()
-                        print("将返回工具选择菜单。")
-
-
-            print("ClientSession 已关闭。")
     except ConnectionRefusedError:
         print(f"错误: 无法连接到服务器 {SERVER_URL}。请确保服务器正在运行且路径正确。")
     except Exception as e:
@@ -422,7 +606,20 @@ if __name__ == "__main__":
     print(f"2. 服务器的MCP挂载点与客户端的 SERVER_URL ('{SERVER_URL}') 一致。")
     print("-------------------------------------------------------------------")
 
-    asyncio.run(main())
+    try:
+        # 可选依赖：uvloop 基于 libuv 实现事件循环，套接字读写与任务调度开销更低；Windows 等未安装时使用默认循环
+        import uvloop
+    except ImportError:
+        uvloop = None
+
+    if uvloop is None:
+        asyncio.run(main())
+    elif sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(main())
+    else:
+        uvloop.install()
+        asyncio.run(main())
 
     print("\n===================================================================")
     print("MCP客户端测试执行完毕。")
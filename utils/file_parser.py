@@ -1,24 +1,151 @@
 import os
+import datetime
+import io
+import stat
+import codecs
+import mmap
+import functools
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional, Tuple, Union # 添加类型提示
-import pdfplumber
-import openpyxl
-from openpyxl.utils.exceptions import InvalidFileException
-from docx import Document  # ✅ 用于加载文档
-from docx.document import Document as DocxDocument  # ✅ 仅用于类型判断
-from docx.table import _Cell
-from docx.text.paragraph import Paragraph
-from docx.table import Table
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple, Union # 添加类型提示
 import logging
+import zipfile
+from lxml import etree
 
 from loguru import logger # 使用 Loguru logger
 
+# pdfplumber (连带 pdfminer.six)、openpyxl、python-docx 导入开销较大，均在实际用到的函数内按需导入，
+# 只读取纯文本文件的调用方不必为此付出导入时间。
+
+try:
+    # 可选依赖：基于 Rust calamine 的 XLSX 读取器，速度远快于 openpyxl；未安装时回退到 openpyxl
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
 # 注意：Loguru logger 通常在主应用程序 (例如 server_v6.py) 中配置。
 # file_parser.py 直接使用导入的 logger 实例。
 
 # 设置 pdfminer 的日志等级为 WARNING 或 ERROR 防止出现CropBox missing from /Page, defaulting to MediaBox
 
 
+# str(float) 在绝对值达到 1e16 后改用科学计数法；openpyxl 读到的这类数值同样是 float，原样输出即可
+_FLOAT_PLAIN_INT_LIMIT = 1e16
+
+
+def _calamine_cell_str(value) -> str:
+    """
+    将 calamine 读出的单元格值转为字符串，与 openpyxl 的输出保持一致：
+    - 空单元格为空串；
+    - calamine 把所有数字读成 float，openpyxl 对整数单元格返回 int，
+      因此只在 str(float) 会写成 "N.0" 的范围内去掉 ".0"，更大的数值保留科学计数法；
+    - 纯日期单元格 calamine 返回 date，openpyxl 返回零点的 datetime，补上时间部分。
+    """
+    if value is None or value == "":
+        return ""
+    value_type = type(value)
+    if value_type is float:
+        if value.is_integer() and -_FLOAT_PLAIN_INT_LIMIT < value < _FLOAT_PLAIN_INT_LIMIT:
+            return str(int(value))
+    elif value_type is datetime.date:
+        return str(datetime.datetime.combine(value, datetime.time()))
+    return str(value)
+
+
+def _calamine_sheet_lines(
+    workbook,
+    sheet_name: str,
+    min_col: Optional[int],
+    max_col: Optional[int],
+    cell_delimiter: str
+) -> List[str]:
+    """
+    用 calamine 读取整个工作表并按 (min_col, max_col) 截取列 (1-based)。
+    指定 max_col 时按 openpyxl iter_rows 的行为补齐空列。
+    """
+    rows = workbook.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+    start = (min_col or 1) - 1
+    width = None if max_col is None else max(max_col - start, 0)
+    lines: List[str] = []
+    for row in rows:
+        values = row[start:] if width is None else row[start:start + width]
+        line = cell_delimiter.join(map(_calamine_cell_str, values))
+        if width is not None and len(values) < width:
+            line += cell_delimiter * (width - len(values))
+        lines.append(line)
+    return lines
+
+
+class XlsxWorkbook:
+    """
+    同一个 XLSX 文件的共享句柄，由 open_xlsx 创建。
+    文件只打开、解析一次 (含 sharedStrings)，sheet 名称列表在打开时确定；
+    需要先取 sheet 名再读取一个或多个 sheet 的调用方应共用同一个句柄。
+    文件无效或损坏时记录错误，sheet_names 为空列表，后续读取均返回空列表。
+    """
+
+    def __init__(self, file_path: Union[str,Path]):
+        self.file_path = file_path
+        self.calamine = None
+        self._openpyxl = None
+        self.sheet_names: List[str] = []
+
+        if CalamineWorkbook is not None:
+            try:
+                self.calamine = CalamineWorkbook.from_path(str(file_path))
+                self.sheet_names = list(self.calamine.sheet_names)
+                return
+            except Exception as e:
+                logger.warning(f"calamine 打开 '{file_path}' 失败，回退到 openpyxl: {e}")
+
+        from openpyxl.utils.exceptions import InvalidFileException
+        try:
+            self.sheet_names = list(self.openpyxl_workbook().sheetnames)
+        except InvalidFileException:
+            logger.error(f"文件 '{file_path}' 不是有效的XLSX文件或已损坏。")
+        except Exception as e:
+            logger.error(f"打开 XLSX 文件 '{file_path}' 失败: {e}", exc_info=True)
+
+    def openpyxl_workbook(self):
+        """按需加载 openpyxl 工作簿 (只读、取计算值)，加载后复用。"""
+        if self._openpyxl is None:
+            import openpyxl
+            # 使用 data_only=True 来获取单元格的计算值而不是公式
+            self._openpyxl = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
+        return self._openpyxl
+
+    def close(self):
+        if self.calamine is not None:
+            self.calamine.close()
+            self.calamine = None
+        if self._openpyxl is not None:
+            self._openpyxl.close()
+            self._openpyxl = None
+
+
+@contextmanager
+def open_xlsx(file_path: Union[str,Path]) -> Iterator[XlsxWorkbook]:
+    """
+    打开 XLSX 文件并返回共享句柄，退出时关闭。用法:
+
+        with open_xlsx(path) as wb:
+            for name in get_xlsx_sheet_names_wb(wb):
+                lines = parse_xlsx_sheet_content_wb(wb, name)
+    """
+    wb = XlsxWorkbook(file_path)
+    try:
+        yield wb
+    finally:
+        wb.close()
+
+
+def get_xlsx_sheet_names_wb(wb: XlsxWorkbook) -> List[str]:
+    """
+    获取已打开的 XLSX 句柄中所有工作表的名称。文件无效时返回空列表。
+    """
+    return list(wb.sheet_names)
+
+
 def get_xlsx_sheet_names(file_path: Union[str,Path]) -> List[str]:
     """
     获取 XLSX 文件中所有工作表的名称。
@@ -27,17 +154,56 @@ def get_xlsx_sheet_names(file_path: Union[str,Path]) -> List[str]:
     返回:
         List[str]: 工作表名称的列表。如果发生错误则返回空列表。
     """
+    with open_xlsx(file_path) as wb:
+        return get_xlsx_sheet_names_wb(wb)
+
+
+def parse_xlsx_sheet_content_wb(
+    wb: XlsxWorkbook,
+    sheet_name: str,
+    column_config: Optional[Tuple[Optional[int], Optional[int]]] = None,
+    cell_delimiter: str = "\t"
+) -> List[str]:
+    """
+    解析已打开的 XLSX 句柄中特定工作表的内容，参数与返回值同 parse_xlsx_sheet_content。
+    """
+    if not wb.sheet_names: # 文件无效，打开时已记录错误
+        return []
+    file_path = wb.file_path
+
+    # iter_rows 的 min_col, max_col 参数是 1-based
+    current_min_col, current_max_col = None, None
+    if column_config:
+        current_min_col, current_max_col = column_config
+
+    if sheet_name not in wb.sheet_names:
+        logger.warning(f"Sheet '{sheet_name}' 在文件 '{file_path}' 中未找到。可用 Sheets: {', '.join(wb.sheet_names)}")
+        return []
+
+    if wb.calamine is not None:
+        try:
+            return _calamine_sheet_lines(wb.calamine, sheet_name, current_min_col, current_max_col, cell_delimiter)
+        except Exception as e:
+            logger.warning(f"calamine 解析 '{file_path}' (Sheet: '{sheet_name}') 失败，回退到 openpyxl: {e}")
 
+    from openpyxl.utils.exceptions import InvalidFileException
+    lines: List[str] = []
     try:
-        workbook = openpyxl.load_workbook(file_path, read_only=True)
-        return workbook.sheetnames
+        sheet = wb.openpyxl_workbook()[sheet_name]
+
+        # sheet.iter_rows() 可以接受 min_col 和 max_col 参数；values_only=True 直接产出值，不创建 Cell 对象
+        _str = str
+        for row in sheet.iter_rows(min_col=current_min_col, max_col=current_max_col, values_only=True):
+            lines.append(cell_delimiter.join("" if v is None else _str(v) for v in row))
+        return lines
     except InvalidFileException:
-        logger.error(f"文件 '{file_path}' 不是有效的XLSX文件或已损坏 (在获取sheet名时)。")
+        logger.error(f"文件 '{file_path}' 不是有效的XLSX文件或已损坏 (在解析sheet内容时)。")
         return []
     except Exception as e:
-        logger.error(f"获取 XLSX 文件 '{file_path}' 的 sheet 名称失败: {e}", exc_info=True)
+        logger.error(f"解析 XLSX 文件 '{file_path}' (Sheet: '{sheet_name}') 时发生错误: {e}", exc_info=True)
         return []
 
+
 def parse_xlsx_sheet_content(
     file_path: Union[str,Path],
     sheet_name: str,
@@ -46,6 +212,7 @@ def parse_xlsx_sheet_content(
 ) -> List[str]:
     """
     解析XLSX文件的特定工作表内容。
+    同一文件需读取多个 sheet 时，应使用 open_xlsx + parse_xlsx_sheet_content_wb 共用一次打开。
 
     参数:
         file_path (str): XLSX文件的路径。
@@ -60,90 +227,193 @@ def parse_xlsx_sheet_content(
         List[str]: 一个字符串列表，每个字符串代表工作表的一行。
                    如果发生错误或sheet未找到，则返回空列表。
     """
-    lines: List[str] = []
-    try:
-        # 使用 data_only=True 来获取单元格的计算值而不是公式
-        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-        if sheet_name not in workbook.sheetnames:
-            logger.warning(f"Sheet '{sheet_name}' 在文件 '{file_path}' 中未找到。可用 Sheets: {', '.join(workbook.sheetnames)}")
-            return []
-        sheet = workbook[sheet_name]
-
-        # iter_rows 的 min_col, max_col 参数是 1-based
-        current_min_col, current_max_col = None, None
-        if column_config:
-            current_min_col, current_max_col = column_config
-
-        # sheet.iter_rows() 可以接受 min_col 和 max_col 参数
-        for row_cells_obj in sheet.iter_rows(min_col=current_min_col, max_col=current_max_col):
-            row_values = [str(cell.value) if cell.value is not None else "" for cell in row_cells_obj]
-            lines.append(cell_delimiter.join(row_values))
-        return lines
-    except InvalidFileException:
-        logger.error(f"文件 '{file_path}' 不是有效的XLSX文件或已损坏 (在解析sheet内容时)。")
-        return []
-    except Exception as e:
-        logger.error(f"解析 XLSX 文件 '{file_path}' (Sheet: '{sheet_name}') 时发生错误: {e}", exc_info=True)
-        return []
+    with open_xlsx(file_path) as wb:
+        return parse_xlsx_sheet_content_wb(wb, sheet_name, column_config, cell_delimiter)
 
 
-def parse_pdf(file_path: Union[str,Path], table_delimiter: str = "\t", max_pages: int = 500) -> Optional[str]:
+def _extract_pdf_page(page, file_path: Union[str,Path], page_no: int, table_delimiter: str) -> Optional[str]:
+    """
+    提取单个 PDF 页面的文本和表格，返回以换行连接的内容。
+    文本提取失败时返回 None (整页跳过，与原始逻辑一致)。
+    """
+    # 提取文本
+    try:
+        page_text = page.extract_text() or ""
+    except Exception as e_text:
+        logger.warning(f"解析 PDF 页面文本失败: '{file_path}', 页码: {page_no+1}, 错误: {e_text}")
+        return None # 继续处理下一页
+
+    # 整页内容写入同一个缓冲区，表格行不再逐行生成列表元素
+    buf = io.StringIO()
+    buf.write(page_text)
+    write = buf.write
+    # 提取表格
+    try:
+        tables = page.extract_tables()
+        if tables: # 确保 tables 不是 None 或空列表
+            for table in tables:
+                if table: # 确保 table 不是 None
+                    for row in table:
+                        if row:  # 跳过空行 (row 本身是列表，列表为空也会跳过)
+                            line = table_delimiter.join(str(cell) if cell is not None else "" for cell in row)
+                            write("\n")
+                            write(line)
+    except Exception as e_table:
+        logger.warning(f"解析 PDF 表格失败: '{file_path}', 页码: {page_no+1}, 错误: {e_table}")
+    return buf.getvalue()
+
+
+def iter_pdf_pages(file_path: Union[str,Path], table_delimiter: str = "\t", max_pages: int = 500) -> Iterator[str]:
     """
-    使用 pdfplumber 解析 PDF 文件，提取文本和表格信息。
-    此版本尽量保持原始逻辑，错误输出改用 Loguru。
+    使用 pdfplumber 逐页解析 PDF 文件，按页码顺序产出每页的文本 (含表格行，以换行连接)。
+    文本提取失败的页面会被跳过 (已记录警告)；打开或读取文件失败时异常直接抛出。
+
+    需要边解析边分块/向量化的调用方可直接消费该生成器，无需先拼出整篇文档:
+
+        for page_idx, page_text in enumerate(iter_pdf_pages(path), start=1):
+            for chunk in split_into_chunks(page_text):
+                index_chunk(chunk, page=page_idx)
 
     参数:
         file_path (str): PDF 文件的路径。
         table_delimiter (str): 表格行内单元格之间的分隔符。
         max_pages (int): 最大处理页数。
-
-    返回:
-        Optional[str]: 解析后的文本内容，或在失败时返回 None。
     """
-    text_content: List[str] = []
     # pdfplumber 依赖 pdfminer.six，后者可能产生一些 INFO 级别的日志。
     # 如果 server_v6.py 中的 Loguru 配置级别高于 INFO，这些日志可能不会显示。
     # 若要完全静默 pdfminer，可以取消下一行的注释，但这通常由主应用的日志配置控制。
     logging.getLogger("pdfminer").setLevel(logging.ERROR) # 已在原始代码中，保持
 
-    try:
-        with pdfplumber.open(file_path) as pdf:
-            for i, page in enumerate(pdf.pages):
-                if i >= max_pages:
-                    logger.info(f"PDF '{file_path}'：达到最大页数限制 {max_pages}，停止解析。")
-                    break
-                # 提取文本
-                try:
-                    page_text = page.extract_text() or ""
-                    text_content.append(page_text)
-                except Exception as e_text:
-                    logger.warning(f"解析 PDF 页面文本失败: '{file_path}', 页码: {i+1}, 错误: {e_text}")
-                    continue # 继续处理下一页或下一个表格
-
-                # 提取表格
-                try:
-                    tables = page.extract_tables()
-                    if tables: # 确保 tables 不是 None 或空列表
-                        for table in tables:
-                            if table: # 确保 table 不是 None
-                                for row in table:
-                                    if row:  # 跳过空行 (row 本身是列表，列表为空也会跳过)
-                                        text_content.append(table_delimiter.join(str(cell) if cell is not None else "" for cell in row))
-                except Exception as e_table:
-                    logger.warning(f"解析 PDF 表格失败: '{file_path}', 页码: {i+1}, 错误: {e_table}")
-                    continue # 继续处理下一页
+    import pdfplumber
+    with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
+        if page_count > max_pages:
+            logger.info(f"PDF '{file_path}'：达到最大页数限制 {max_pages}，停止解析。")
+            page_count = max_pages
+        for i in range(page_count):
+            page_content = _extract_pdf_page(pdf.pages[i], file_path, i, table_delimiter)
+            if page_content is not None:
+                yield page_content
 
-        content = "\n".join(text_content)
-        return content
+
+def parse_pdf(file_path: Union[str,Path], table_delimiter: str = "\t", max_pages: int = 500) -> Optional[str]:
+    """
+    使用 pdfplumber 解析 PDF 文件，提取文本和表格信息。逐页解析由 iter_pdf_pages 完成。
+
+    参数:
+        file_path (str): PDF 文件的路径。
+        table_delimiter (str): 表格行内单元格之间的分隔符。
+        max_pages (int): 最大处理页数。
+
+    返回:
+        Optional[str]: 解析后的文本内容，或在失败时返回 None。
+    """
+    try:
+        return "\n".join(iter_pdf_pages(file_path, table_delimiter, max_pages))
     except Exception as e_main:
         logger.error(f"解析 PDF 文件 '{file_path}' 失败: {e_main}", exc_info=True)
         return None
 
 
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# 带命名空间的完整标签名，按相等比较，不再用 endswith 做后缀匹配
+_TAG_P = _W + "p"
+_TAG_TBL = _W + "tbl"
+# 段落内的文本节点：与 python-docx 的 Paragraph.text 取值范围一致 (直属 run 及超链接中的 run)
+_RUN_CONTENT_XPATH = etree.XPath(
+    "w:r/*|w:hyperlink/w:r/*",
+    namespaces={"w": _W[1:-1]}
+)
+_RUN_CONTENT_TEXT = {
+    _W + "tab": "\t",
+    _W + "ptab": "\t",
+    _W + "cr": "\n",
+    _W + "noBreakHyphen": "-",
+}
+
+
+def _docx_paragraph_text(p) -> str:
+    """按 python-docx 的规则拼接 <w:p> 的文本 (w:t 原文，w:tab 转制表符，换行型 w:br 转换行)。"""
+    parts = []
+    for item in _RUN_CONTENT_XPATH(p):
+        tag = item.tag
+        if tag == _W + "t":
+            parts.append(item.text or "")
+        elif tag == _W + "br":
+            if item.get(_W + "type", "textWrapping") == "textWrapping":
+                parts.append("\n")
+        else:
+            parts.append(_RUN_CONTENT_TEXT.get(tag, ""))
+    return "".join(parts)
+
+
+def _docx_cell_text(tc) -> str:
+    """<w:tc> 的文本：原始逻辑为单元格内各段落以换行连接，再把换行替换为制表符。"""
+    return "\n".join(_docx_paragraph_text(p) for p in tc.iterchildren(_TAG_P)).replace("\n", "\t")
+
+
+def _docx_int_prop(parent, prop_tag: str, default: int) -> int:
+    """读取 trPr/gridBefore、tcPr/gridSpan 这类整数属性。"""
+    if parent is None:
+        return default
+    prop = parent.find(prop_tag)
+    if prop is None:
+        return default
+    return int(prop.get(_W + "val", default))
+
+
+def _docx_table_rows(tbl, table_delimiter: str) -> List[str]:
+    """
+    将 <w:tbl> 转为文本行。与 python-docx 的 row.cells 一致：
+    横向合并的单元格按跨列数重复，纵向合并的续行单元格取上一行同列的内容。
+    """
+    lines: List[str] = []
+    cells_above: dict = {}
+    for tr in tbl.iterchildren(_W + "tr"):
+        grid_offset = _docx_int_prop(tr.find(_W + "trPr"), _W + "gridBefore", 0)
+        row_cells: List[str] = []
+        cells_here: dict = {}
+        for tc in tr.iterchildren(_W + "tc"):
+            tc_pr = tc.find(_W + "tcPr")
+            grid_span = _docx_int_prop(tc_pr, _W + "gridSpan", 1)
+            v_merge = tc_pr.find(_W + "vMerge") if tc_pr is not None else None
+            if v_merge is not None and v_merge.get(_W + "val", "continue") == "continue" \
+                    and grid_offset in cells_above:
+                cells = cells_above[grid_offset]
+            else:
+                cells = [_docx_cell_text(tc)] * grid_span
+            cells_here[grid_offset] = cells
+            row_cells.extend(cells)
+            grid_offset += grid_span
+        cells_above = cells_here
+        lines.append(table_delimiter.join(row_cells))
+    return lines
+
+
+def _iter_docx_body_text(source, table_delimiter: str):
+    """
+    以 iterparse 流式读取 word/document.xml，按文档顺序产出正文顶层段落和表格的文本行。
+    每个顶层元素处理完即清空并从树上摘除，内存占用与单个段落/表格相当，而非整篇文档。
+    """
+    context = etree.iterparse(source, events=("end",), tag=(_TAG_P, _TAG_TBL), resolve_entities=False)
+    for _, elem in context:
+        parent = elem.getparent()
+        if parent is None or parent.tag != _W + "body":
+            continue # 表格单元格内的段落随所在表格一并处理
+        if elem.tag == _TAG_P:
+            yield _docx_paragraph_text(elem)
+        else:
+            yield from _docx_table_rows(elem, table_delimiter)
+        elem.clear()
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
 def parse_docx(file_path: Union[str,Path], table_delimiter: str = "\t") -> Optional[str]:
     """
-    使用 python-docx 解析 docx 文件，保证段落和表格顺序与原文档一致。
-    此版本尽量保持原始逻辑，错误输出改用 Loguru。
+    解析 docx 文件，保证段落和表格顺序与原文档一致。
+    优先用 lxml iterparse 流式读取 word/document.xml，不构建 python-docx 的完整对象树；
+    主文档部件不在 word/document.xml 时回退到 python-docx。错误输出使用 Loguru。
 
     参数:
         file_path (str): DOCX 文件的路径。
@@ -152,7 +422,7 @@ def parse_docx(file_path: Union[str,Path], table_delimiter: str = "\t") -> Optio
     返回:
         Optional[str]: 解析后的文本内容，或在失败时返回 None。
     """
-    def iter_block_items(parent: Union[DocxDocument, _Cell]):
+    def iter_block_items(parent: "Union[DocxDocument, _Cell]"):
         """
         迭代文档或单元格中的所有顶级块级元素 (段落和表格)。
         """
@@ -165,21 +435,33 @@ def parse_docx(file_path: Union[str,Path], table_delimiter: str = "\t") -> Optio
             return # 或者 raise TypeError
 
         for child in parent_elm.iterchildren():
-            if child.tag.endswith('p'): # 段落
+            tag = child.tag
+            if tag == _TAG_P: # 段落
                 yield Paragraph(child, parent)
-            elif child.tag.endswith('tbl'): # 表格
+            elif tag == _TAG_TBL: # 表格
                 yield Table(child, parent)
 
     text_content: List[str] = []
     try:
+        with zipfile.ZipFile(file_path) as docx_zip:
+            if "word/document.xml" in docx_zip.namelist():
+                with docx_zip.open("word/document.xml") as source:
+                    return "\n".join(_iter_docx_body_text(source, table_delimiter))
+
+        # 主文档部件不在常规位置时，交给 python-docx 按关系解析
+        from docx import Document  # ✅ 用于加载文档
+        from docx.document import Document as DocxDocument  # ✅ 仅用于类型判断
+        from docx.table import _Cell, Table
+        from docx.text.paragraph import Paragraph
+
         doc = Document(file_path)
         for block in iter_block_items(doc):
             if isinstance(block, Paragraph):
                 text_content.append(block.text) # 原始逻辑：直接获取段落文本
             elif isinstance(block, Table):
                 for row in block.rows:
-                    # 原始逻辑：替换单元格内的换行符为制表符
-                    row_cells = [cell.text.replace("\n", "\t") for cell in row.cells]
+                    # 直接在 <w:tc> 上用预编译 XPath 取文本，绕过 python-docx 的 Cell.text 包装对象
+                    row_cells = [_docx_cell_text(cell._tc) for cell in row.cells]
                     text_content.append(table_delimiter.join(row_cells))
         content = "\n".join(text_content)
         return content
@@ -190,7 +472,7 @@ def parse_docx(file_path: Union[str,Path], table_delimiter: str = "\t") -> Optio
 
 def parse_xlsx(file_path: Union[str,Path], cell_delimiter: str = "\t") -> Optional[str]:
     """
-    使用 openpyxl 解析 xlsx 文件，提取所有 sheet 的文本。
+    解析 xlsx 文件，提取所有 sheet 的文本。优先使用 calamine，不可用或失败时使用 openpyxl。
     此函数为 `parse_file` 的通用 XLSX 解析器，保持原始的列限制逻辑。
     错误输出改用 Loguru。
 
@@ -201,16 +483,36 @@ def parse_xlsx(file_path: Union[str,Path], cell_delimiter: str = "\t") -> Option
     返回:
         Optional[str]: 解析后的文本内容，或在失败时返回 None。
     """
+    if CalamineWorkbook is not None:
+        try:
+            wb = CalamineWorkbook.from_path(str(file_path))
+            try:
+                calamine_content: List[str] = []
+                for sheet_name in wb.sheet_names:
+                    calamine_content.append(f"=== Sheet: {sheet_name} ===")
+                    # 保持原始代码中的列限制 (min_col=1, max_col=6)
+                    calamine_content.extend(_calamine_sheet_lines(wb, sheet_name, 1, 6, cell_delimiter))
+            finally:
+                wb.close()
+            return "\n".join(calamine_content)
+        except Exception as e:
+            logger.warning(f"calamine 解析 '{file_path}' 失败，回退到 openpyxl: {e}")
+
+    import openpyxl
+    from openpyxl.utils.exceptions import InvalidFileException
     text_content: List[str] = []
     try:
         wb = openpyxl.load_workbook(file_path, data_only=True, read_only=True) # read_only=True 提高性能
-        for sheet_name in wb.sheetnames:
-            sheet = wb[sheet_name]
-            text_content.append(f"=== Sheet: {sheet_name} ===")
-            # 保持原始代码中的列限制 (min_col=1, max_col=6)
-            for row in sheet.iter_rows(values_only=True, min_col=1, max_col=6):
-                row_values = [str(cell) if cell is not None else "" for cell in row]
-                text_content.append(cell_delimiter.join(row_values))
+        try:
+            _str = str
+            for sheet_name in wb.sheetnames:
+                sheet = wb[sheet_name]
+                text_content.append(f"=== Sheet: {sheet_name} ===")
+                # 保持原始代码中的列限制 (min_col=1, max_col=6)
+                for row in sheet.iter_rows(values_only=True, min_col=1, max_col=6):
+                    text_content.append(cell_delimiter.join("" if v is None else _str(v) for v in row))
+        finally:
+            wb.close()
         content = "\n".join(text_content)
         return content
     except InvalidFileException:
@@ -221,54 +523,152 @@ def parse_xlsx(file_path: Union[str,Path], cell_delimiter: str = "\t") -> Option
         return None
 
 
-def parse_file(file_path: Union[str,Path], delimiter: str = "\t") -> Optional[str]:
+class _ParseFailed(Exception):
+    """内部使用：携带解析失败的结果，使其不被 _parse_cached 缓存。"""
+
+
+# 扩展名 -> 解析函数，各函数的第二个位置参数均为分隔符
+# parse_xlsx 用于 get_file_content 的通用解析；特定sheet的读取由 compare_project_file 等工具直接调用 parse_xlsx_sheet_content
+_PARSERS: Dict[str, Callable[[str, str], Optional[str]]] = {
+    ".pdf": parse_pdf,
+    ".xlsx": parse_xlsx,
+    ".docx": parse_docx,
+}
+
+# 常见纯文本格式，直接读取
+_PLAINTEXT_EXTS: FrozenSet[str] = frozenset({
+    '.txt', '.md', '.csv', '.log', '.json', '.xml', '.html', '.yaml', '.yml', '.ini', '.cfg',
+    '.py', '.js', '.ts', '.java', '.c', '.cpp', '.h', '.hpp', '.cs', '.go', '.php', '.rb', '.sh', '.bat',
+})
+
+
+# 超过该大小的纯文本文件分块解码，避免完整的字节串与解码后的字符串同时驻留内存
+_PLAINTEXT_CHUNKED_MIN_BYTES = 64 << 20
+_PLAINTEXT_CHUNK_SIZE = 8 << 20
+
+
+def _read_plaintext(file_path: Union[str,Path]) -> str:
+    """
+    以 UTF-8 读取纯文本文件，忽略无法解码的字节，换行符统一为 \\n (与文本模式 open().read() 的结果一致)。
+    一次读入全部字节后整体解码，省去文本 IO 层逐块解码的开销；大文件改为分块增量解码。
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < _PLAINTEXT_CHUNKED_MIN_BYTES:
+            text = f.read().decode('utf-8', 'ignore')
+            if "\r" in text:
+                text = text.replace("\r\n", "\n").replace("\r", "\n")
+            return text
+
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(errors='ignore'), translate=True)
+        parts: List[str] = []
+        while chunk := f.read(_PLAINTEXT_CHUNK_SIZE):
+            parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b"", final=True))
+        return "".join(parts)
+
+
+def _read_plaintext_head(file_path: Union[str,Path], max_bytes: int) -> str:
+    """
+    只读取超大纯文本文件的前 max_bytes 字节：通过 mmap 定位最后一个完整行的结尾，
+    只复制这一段字节后解码，不把整个文件读入内存。
+    """
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = mm.rfind(b"\n", 0, max_bytes) + 1 or max_bytes # 没有换行时按字节截断，残缺的多字节字符由 ignore 丢弃
+        text = mm[:end].decode('utf-8', 'ignore')
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _parse_by_extension(file_path: str, delimiter: str) -> Optional[str]:
+    """
+    根据扩展名分派到具体解析函数，返回解析内容、错误信息字符串或 None。
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    content: Optional[str] = None
+    try:
+        parser = _PARSERS.get(ext)
+        if parser is not None:
+            content = parser(file_path, delimiter)
+        elif ext in _PLAINTEXT_EXTS:
+            logger.info(f"文件 '{file_path}' (类型: {ext}) 将作为纯文本文件读取。")
+            try:
+                content = _read_plaintext(file_path)
+            except Exception as e_txt:
+                logger.error(f"作为纯文本文件读取 '{file_path}' 失败: {e_txt}")
+                content = f"错误: 文件 {os.path.basename(file_path)} 作为纯文本读取失败。" # 返回错误信息
+        else:
+            logger.warning(f"文件 '{file_path}' 的扩展名 '{ext}' 不在已知解析类型中，也非标准纯文本类型。")
+            content = f"错误: 不支持的文件类型 {ext}。" # 返回错误信息
+
+    except Exception as e_parse: # 捕获在调用解析函数时可能发生的其他意外错误
+        logger.error(f"解析文件 '{file_path}' 过程中发生顶层错误: {e_parse}", exc_info=True)
+        content = f"错误: 解析文件 {os.path.basename(file_path)} 时发生严重错误。"
+    return content
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_cached(abspath: str, mtime_ns: int, size: int, delimiter: str) -> str:
+    """
+    按 (绝对路径, 修改时间, 大小, 分隔符) 缓存解析结果，文件变化后键随之变化，旧条目自然失效。
+    失败结果通过 _ParseFailed 抛出，不会进入缓存。
+    """
+    content = _parse_by_extension(abspath, delimiter)
+    if content is None or content.startswith("错误:"):
+        raise _ParseFailed(content)
+    return content
+
+
+# parse_file 默认的文件大小上限
+_MAX_PARSE_BYTES = 128 << 20
+
+
+def parse_file(
+    file_path: Union[str,Path],
+    delimiter: str = "\t",
+    max_bytes: Optional[int] = _MAX_PARSE_BYTES
+) -> Optional[str]:
     """
     根据文件扩展名，自动调用相应的解析函数。
+    未修改的文件直接返回缓存的解析结果。
+    超过 max_bytes 的纯文本文件只读取开头 (在行边界截断，不缓存)，其他类型直接返回错误信息，避免耗尽内存。
 
     参数:
         file_path (str): 待解析文件的路径。
         delimiter (str): 用于表格或行内数据分隔的字符。
+        max_bytes (Optional[int]): 文件大小上限 (字节)，None 表示不限制。
 
     返回:
         Optional[str]: 解析后的文本内容。
                        如果文件不存在、不支持或解析失败，则返回包含错误信息的字符串或 None。
     """
-    ext = os.path.splitext(file_path)[1].lower()
-    # logger.debug(f"开始解析文件: '{file_path}' (类型: {ext}), 分隔符: '{delimiter}'")
-    content: Optional[str] = None
-
-    if not os.path.exists(file_path):
+    # logger.debug(f"开始解析文件: '{file_path}', 分隔符: '{delimiter}'")
+    # 一次 stat 同时完成存在性与文件类型检查，结果再用作缓存键
+    try:
+        st = os.stat(file_path)
+    except OSError: # 与 os.path.exists 一致：任何 stat 失败均视为文件不存在
         logger.error(f"文件未找到: {file_path}")
         return f"错误: 文件 {os.path.basename(file_path)} 未找到。"
-    if not os.path.isfile(file_path): # 确保是文件而不是目录
+    if not stat.S_ISREG(st.st_mode): # 确保是文件而不是目录
         logger.error(f"路径不是一个文件: {file_path}")
         return f"错误: 路径 {os.path.basename(file_path)} 不是一个有效文件。"
 
-    try:
-        if ext == ".pdf":
-            content = parse_pdf(file_path, table_delimiter=delimiter)
-        elif ext == ".xlsx":
-            # parse_xlsx 用于 get_file_content 的通用解析
-            # 特定sheet的读取由 compare_project_file 等工具直接调用 parse_xlsx_sheet_content
-            content = parse_xlsx(file_path, cell_delimiter=delimiter)
-        elif ext == ".docx":
-            content = parse_docx(file_path, table_delimiter=delimiter)
-        # 增加对常见纯文本格式的直接读取
-        elif ext in ['.txt', '.md', '.csv', '.log', '.json', '.xml', '.html', '.yaml', '.yml', '.ini', '.cfg', '.py', '.js', '.ts', '.java', '.c', '.cpp', '.h', '.hpp', '.cs', '.go', '.php', '.rb', '.sh', '.bat']:
-            logger.info(f"文件 '{file_path}' (类型: {ext}) 将作为纯文本文件读取。")
+    if max_bytes is not None and st.st_size > max_bytes:
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in _PLAINTEXT_EXTS:
+            logger.warning(f"文件 '{file_path}' 大小 {st.st_size}B 超过上限 {max_bytes}B，只读取前 {max_bytes}B。")
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
+                return _read_plaintext_head(file_path, max_bytes)
             except Exception as e_txt:
                 logger.error(f"作为纯文本文件读取 '{file_path}' 失败: {e_txt}")
-                content = f"错误: 文件 {os.path.basename(file_path)} 作为纯文本读取失败。" # 返回错误信息
-        else:
-            logger.warning(f"文件 '{file_path}' 的扩展名 '{ext}' 不在已知解析类型中，也非标准纯文本类型。")
-            content = f"错误: 不支持的文件类型 {ext}。" # 返回错误信息
+                return f"错误: 文件 {os.path.basename(file_path)} 作为纯文本读取失败。"
+        logger.warning(f"文件 '{file_path}' 大小 {st.st_size}B 超过上限 {max_bytes}B，不进行解析。")
+        return f"错误: 文件 {os.path.basename(file_path)} 过大 ({st.st_size}B > {max_bytes}B)。"
 
-    except Exception as e_parse: # 捕获在调用解析函数时可能发生的其他意外错误
-        logger.error(f"解析文件 '{file_path}' 过程中发生顶层错误: {e_parse}", exc_info=True)
-        content = f"错误: 解析文件 {os.path.basename(file_path)} 时发生严重错误。"
+    try:
+        return _parse_cached(os.path.abspath(file_path), st.st_mtime_ns, st.st_size, delimiter)
+    except _ParseFailed as e_failed:
+        content = e_failed.args[0]
 
     # 在返回前最后检查 content
     if content is None:
@@ -276,10 +676,8 @@ def parse_file(file_path: Union[str,Path], delimiter: str = "\t") -> Optional[st
         logger.warning(f"文件 '{file_path}' 的特定解析器返回 None。")
         return f"错误: 文件 {os.path.basename(file_path)} 解析失败或不受支持。"
 
-    # 如果 content 已经是错误消息字符串，直接返回
-    if isinstance(content, str) and content.startswith("错误:"):
-        # logger.debug(f"文件 '{file_path}' 解析返回预定义的错误消息: {content}") # 此日志可能冗余
-        return content
-
-    # logger.debug(f"文件 '{file_path}' 解析完成，内容长度: {len(content)}")
+    # content 已经是错误消息字符串，直接返回
     return content
+
+
+parse_file.cache_clear = _parse_cached.cache_clear # type: ignore[attr-defined]
@@ -0,0 +1,33 @@
+"""
+进程内共享的 httpx 异步客户端。
+
+健康检查等短请求复用同一个连接池，保持长连接，避免每次都重新进行 TCP/TLS 握手。
+客户端在首次使用时创建，应用关闭时由 lifespan 调用 close_shared_client() 释放。
+"""
+import importlib.util
+from typing import Optional
+
+import httpx
+from loguru import logger
+
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+def get_shared_client() -> httpx.AsyncClient:
+    """获取共享客户端，不存在或已关闭时重新创建。"""
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None, # 安装了 h2 时启用 HTTP/2
+            limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60),
+            timeout=httpx.Timeout(5.0, connect=2.0),
+        )
+        logger.debug("共享 HTTPX 客户端已创建。")
+    return _CLIENT
+
+async def close_shared_client() -> None:
+    """关闭共享客户端并释放连接池；未创建过时什么也不做。"""
+    global _CLIENT
+    client, _CLIENT = _CLIENT, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.debug("共享 HTTPX 客户端已关闭。")
@@ -1,10 +1,23 @@
-import psutil # 用于IPv6地址处理
+import psutil # 用于IPv6地址处理 (非 Linux 平台)
 import socket # 用于 socket.AF_INET6
+import sys
+import ctypes
 import time # 用于时间处理
+import random
 import hashlib # 用于MD5哈希计算
+import mmap # 用于大文件的内存映射读取
+import os
+import stat
+import json
+import copy
+import shutil
+import tempfile
+import zipfile
 from pathlib import Path # 用于路径操作
+from functools import lru_cache
 from typing import Optional, Tuple # 用于类型提示
 import httpx # 导入 httpx
+from lxml import etree
 from docx import Document
 from docx.oxml.text.paragraph import CT_P
 from docx.oxml.text.run import CT_R
@@ -13,31 +26,99 @@ from docx.text.run import Run
 
 from loguru import logger # 从 loguru 导入 logger
 from config import settings # 导入配置 settings
+from utils.http import get_shared_client
 
-async def check_embedding_service_health(client: httpx.AsyncClient) -> bool:
+# 健康检查成功的结果缓存约 _HEALTH_TTL 秒 (±_HEALTH_SMUDGE 秒随机抖动，避免多个 worker 同时重新探测)；
+# 失败结果不缓存，服务恢复后下一次调用即可发现
+_HEALTH_CACHE = {"ok": False, "expires_at": 0.0}
+_HEALTH_TTL = 10.0
+_HEALTH_SMUDGE = 1.0
+
+async def check_embedding_service_health(client: Optional[httpx.AsyncClient] = None, *, force: bool = False) -> bool:
     """
     检查嵌入模型服务的健康状况。
     通过请求模型的形式来验证服务端点是否可用
+    未传入 client 时使用 utils.http 的共享客户端，复用已有的长连接。
+    最近一次成功的结果在缓存有效期内直接返回；force=True 时忽略缓存重新探测。
+    """
+    if not force and time.monotonic() < _HEALTH_CACHE["expires_at"]:
+        return _HEALTH_CACHE["ok"]
+
+    ok = await _probe_embedding_service(client if client is not None else get_shared_client())
+    _HEALTH_CACHE["ok"] = ok
+    _HEALTH_CACHE["expires_at"] = (
+        time.monotonic() + _HEALTH_TTL + random.uniform(-_HEALTH_SMUDGE, _HEALTH_SMUDGE) if ok else 0.0
+    )
+    return ok
+
+# 健康检查最多读取的响应体字节数；超出部分不再下载 (连接随之关闭，不放回连接池)
+_HEALTH_BODY_LIMIT = 64 * 1024
+
+async def _read_body_limited(response: httpx.Response, limit: int) -> Tuple[bytes, bool]:
+    """流式读取响应体，最多 limit 字节。返回 (内容, 是否被截断)。"""
+    buf = bytearray()
+    async for chunk in response.aiter_bytes():
+        buf += chunk
+        if len(buf) > limit:
+            return bytes(buf[:limit]), True
+    return bytes(buf), False
+
+# 服务端不支持 HEAD (返回 405/501) 时记下来，此后直接用 GET，不再每次先试 HEAD
+_HEALTH_HEAD_UNSUPPORTED = False
+
+async def _send_health_request(client: httpx.AsyncClient, method: str, api_url: str,
+                               headers: dict) -> Tuple[httpx.Response, bytes, bool]:
+    """发送一次健康检查请求，返回 (响应, 响应体, 是否被截断)。"""
+    # 为健康检查设置一个较短的超时时间，例如5秒
+    request = client.build_request(method, api_url, headers=headers, timeout=5.0)
+    response = await client.send(request, stream=True)
+    try:
+        # 小响应体完整读完，连接才能放回连接池复用
+        body, truncated = await _read_body_limited(response, _HEALTH_BODY_LIMIT)
+    finally:
+        await response.aclose()
+    return response, body, truncated
+
+@lru_cache(maxsize=4)
+def _health_target(base_url, api_key) -> Tuple[str, dict]:
+    """
+    由嵌入服务地址和密钥构建健康检查的 URL 与请求头，按配置值缓存，运行期间不再重复拼接；
+    settings 被替换或重新加载时键随之变化，自动重新构建。返回的 headers 为共享对象，不要修改。
     """
     # 确保基础 URL 没有尾随斜杠，然后附加 '/models'
-    api_url = f"{str(settings.EMBEDDING_API_URL).rstrip('/')}/models"
+    api_url = f"{str(base_url).rstrip('/')}/models"
     headers = {
-        "Authorization": f"Bearer {settings.EMBEDDING_APIKEY.get_secret_value()}"
+        "Authorization": f"Bearer {api_key.get_secret_value()}"
     }
+    return api_url, headers
+
+async def _probe_embedding_service(client: httpx.AsyncClient) -> bool:
+    """实际向嵌入模型服务发起一次探测请求。"""
+    global _HEALTH_HEAD_UNSUPPORTED
+    api_url, headers = _health_target(settings.EMBEDDING_API_URL, settings.EMBEDDING_APIKEY)
     try:
         logger.info(f"正在检查嵌入模型服务，目标URL: {api_url}")
-        # 为健康检查设置一个较短的超时时间，例如5秒
-        response = await client.get(api_url, headers=headers, timeout=5.0)
-        
-        if response.status_code == 200:
-            # logger.info("嵌入模型服务健康检查成功，服务端点可用。")
-            # 可选: 更详细地检查响应内容
-            models = response.json()
-            model_names = [model.get('id') for model in models.get('data', [])]
-            logger.info(f"嵌入模型服务可用，模型列表: {model_names}")
+        # 默认用 HEAD 探测，只传输响应头；需要记录模型列表或服务端不支持 HEAD 时用 GET
+        list_models = settings.EMBEDDING_HEALTH_LIST_MODELS
+        method = "GET" if list_models or _HEALTH_HEAD_UNSUPPORTED else "HEAD"
+        response, body, truncated = await _send_health_request(client, method, api_url, headers)
+        if method == "HEAD" and response.status_code in (405, 501):
+            logger.info(f"嵌入模型服务不支持 HEAD 请求 ({response.status_code})，改用 GET 进行健康检查。")
+            _HEALTH_HEAD_UNSUPPORTED = True
+            method = "GET"
+            response, body, truncated = await _send_health_request(client, method, api_url, headers)
+
+        if 200 <= response.status_code < 400:
+            # 默认只看状态码；需要时再解析模型列表 (响应体被截断时无法解析)
+            if method == "GET" and list_models and response.status_code < 300 and not truncated:
+                models = json.loads(body)
+                model_names = [model.get('id') for model in models.get('data', [])]
+                logger.info(f"嵌入模型服务可用，模型列表: {model_names}")
+            else:
+                logger.info("嵌入模型服务健康检查成功，服务端点可用。")
             return True
         else:
-            logger.warning(f"嵌入模型服务健康检查返回非200状态码: {response.status_code}，响应: {response.text}")
+            logger.warning(f"嵌入模型服务健康检查返回异常状态码: {response.status_code}，响应: {body.decode('utf-8', 'replace')}")
             return False
     except httpx.RequestError as e:
         # 捕获所有 httpx 请求相关的错误 (例如: 连接错误, 超时)
@@ -48,10 +129,15 @@ async def check_embedding_service_health(client: httpx.AsyncClient) -> bool:
         logger.error(f"检查嵌入模型服务时发生未知错误: {e}", exc_info=True)
         return False
 
+# 接口地址以分钟级变化，按接口缓存查询结果: {接口名: (过期时刻 monotonic, 地址)}
+_IPV6_CACHE: dict[str, tuple[float, str]] = {}
+_IPV6_TTL = 30.0
+
 def get_host_ipv6_addr(interface: Optional[str] = None) -> str:
     """
     获取指定网络接口的非链接本地IPv6地址。
     如果未提供接口，则使用配置中的 settings.SERVER_INTERFACE。
+    结果按接口缓存 _IPV6_TTL 秒，避免每个请求都遍历全部网卡。
     """
     # 如果函数调用时未指定 interface，则使用配置文件中的值
     if interface is None:
@@ -59,7 +145,101 @@ def get_host_ipv6_addr(interface: Optional[str] = None) -> str:
     else:
         interface_to_use = interface
 
+    now = time.monotonic()
+    cached = _IPV6_CACHE.get(interface_to_use)
+    if cached is not None and now < cached[0]:
+        return cached[1]
+
+    ipv6_addr = _lookup_ipv6_addr(interface_to_use)
+    # 过期时刻随机提前最多 10%，避免多个 worker 在同一时刻集中刷新
+    _IPV6_CACHE[interface_to_use] = (now + _IPV6_TTL - random.uniform(0, 0.1 * _IPV6_TTL), ipv6_addr)
+    return ipv6_addr
+
+# Linux 上直接调用 getifaddrs(3) 遍历地址链表，只解析目标接口的 IPv6 地址，
+# 不必像 psutil.net_if_addrs() 那样为每个网卡的每个地址族都构建 Python 对象
+class _SockAddr(ctypes.Structure):
+    _fields_ = [("sa_family", ctypes.c_ushort)]
+
+class _SockAddrIn6(ctypes.Structure):
+    _fields_ = [
+        ("sin6_family", ctypes.c_ushort),
+        ("sin6_port", ctypes.c_uint16),
+        ("sin6_flowinfo", ctypes.c_uint32),
+        ("sin6_addr", ctypes.c_ubyte * 16),
+        ("sin6_scope_id", ctypes.c_uint32),
+    ]
+
+class _IfAddrs(ctypes.Structure):
+    pass
+
+_IfAddrs._fields_ = [
+    ("ifa_next", ctypes.POINTER(_IfAddrs)),
+    ("ifa_name", ctypes.c_char_p),
+    ("ifa_flags", ctypes.c_uint),
+    ("ifa_addr", ctypes.POINTER(_SockAddr)),
+    ("ifa_netmask", ctypes.POINTER(_SockAddr)),
+    ("ifa_ifu", ctypes.POINTER(_SockAddr)),
+    ("ifa_data", ctypes.c_void_p),
+]
+
+_libc = None
+if sys.platform.startswith("linux"):
     try:
+        _libc = ctypes.CDLL("libc.so.6", use_errno=True)
+        _libc.getifaddrs.argtypes = [ctypes.POINTER(ctypes.POINTER(_IfAddrs))]
+        _libc.getifaddrs.restype = ctypes.c_int
+        _libc.freeifaddrs.argtypes = [ctypes.POINTER(_IfAddrs)]
+        _libc.freeifaddrs.restype = None
+    except (OSError, AttributeError): # 非 glibc 系统等，回退到 psutil
+        _libc = None
+
+def _getifaddrs_ipv6(interface: str) -> Optional[Tuple[bool, str]]:
+    """
+    通过 getifaddrs(3) 查找接口上第一个非链接本地的 IPv6 地址。
+    返回 (接口是否存在, 地址或空字符串)；当前平台不可用时返回 None。
+    """
+    if _libc is None:
+        return None
+    head = ctypes.POINTER(_IfAddrs)()
+    if _libc.getifaddrs(ctypes.byref(head)) != 0:
+        raise OSError(ctypes.get_errno(), "getifaddrs 调用失败")
+    name = interface.encode()
+    found = False
+    try:
+        node = head
+        while node:
+            ifa = node.contents
+            if ifa.ifa_name == name:
+                found = True
+                if ifa.ifa_addr and ifa.ifa_addr.contents.sa_family == socket.AF_INET6:
+                    sin6 = ctypes.cast(ifa.ifa_addr, ctypes.POINTER(_SockAddrIn6)).contents
+                    address = socket.inet_ntop(socket.AF_INET6, bytes(sin6.sin6_addr))
+                    if not address.startswith('fe80::'):
+                        return True, address
+            node = ifa.ifa_next
+        return found, ""
+    finally:
+        _libc.freeifaddrs(head)
+
+def _lookup_ipv6_addr(interface_to_use: str) -> str:
+    """实际查询接口上的非链接本地IPv6地址，未找到或出错时返回空字符串。"""
+    try:
+        result = _getifaddrs_ipv6(interface_to_use)
+        if result is not None:
+            found, ipv6_addr = result
+            if not found:
+                logger.info(f"未获取到接口 {interface_to_use} 的 IP 信息")
+            elif not ipv6_addr:
+                logger.info(f"接口 {interface_to_use} 上未找到合适的 IPv6 地址。")
+            return ipv6_addr
+
+        # 接口不存在时用 if_nameindex 提前返回，不必构建 psutil 的全量地址表；
+        # Windows 上 if_nameindex 返回的名称与 psutil 不一致，不做此检查
+        if sys.platform != "win32" and hasattr(socket, "if_nameindex"):
+            if interface_to_use not in {name for _, name in socket.if_nameindex()}:
+                logger.info(f"未获取到接口 {interface_to_use} 的 IP 信息")
+                return ""
+
         if_addrs = psutil.net_if_addrs()
         if interface_to_use not in if_addrs:
             logger.info(f"未获取到接口 {interface_to_use} 的 IP 信息")
@@ -74,34 +254,79 @@ def get_host_ipv6_addr(interface: Optional[str] = None) -> str:
         logger.error(f"获取接口 {interface_to_use} 的 IPv6 地址失败: {e}")
         return ""
 
+# 格式化字符串只精确到秒，缓存最近一秒的结果: (整数秒, 格式化字符串)。
+# 整体替换元组，多线程下最多重复计算一次，不会读到不一致的值
+_LAST_TIME_STR: Tuple[int, str] = (-1, "")
+
 def get_current_time()-> Tuple[float, str]:
     """
     获取当前时间戳和格式化后的时间字符串。
     返回:
         一个元组，包含 (时间戳_float, "YYYY-MM-DD HH:MM:SS"格式的字符串)
     """
+    global _LAST_TIME_STR
     current_timestamp = time.time()
-    local_time_struct = time.localtime(current_timestamp)
-    formatted_string = time.strftime("%Y-%m-%d %H:%M:%S", local_time_struct)
+    second = int(current_timestamp)
+    cached_second, formatted_string = _LAST_TIME_STR
+    if second != cached_second:
+        local_time_struct = time.localtime(second)
+        formatted_string = time.strftime("%Y-%m-%d %H:%M:%S", local_time_struct)
+        _LAST_TIME_STR = (second, formatted_string)
     return (current_timestamp, formatted_string)
 
-def calculate_md5(file_path: Path) -> Optional[str]:
+# 不小于该大小的文件通过 mmap 整体交给 hashlib 一次计算；小文件的映射开销不划算，仍按块读取
+_HASH_MMAP_MIN_BYTES = 10 * 1024 * 1024
+# 按块读取时的块大小：较大的块摊薄每次 read/update 的 Python 调用开销
+_HASH_CHUNK = 1 << 20
+# 哈希时文件只被顺序读取一次：提示内核加大预读；大文件读完后丢弃其页缓存，避免挤占其他热点文件。
+# posix_fadvise / MADV_SEQUENTIAL 只在 Linux 等 POSIX 平台提供
+_posix_fadvise = getattr(os, "posix_fadvise", None)
+_MADV_SEQUENTIAL = getattr(mmap, "MADV_SEQUENTIAL", None)
+
+def _fadvise(fd: int, advice_name: str) -> None:
+    """尽力而为地调用 posix_fadvise；平台不支持或调用失败时忽略。"""
+    if _posix_fadvise is None:
+        return
+    try:
+        _posix_fadvise(fd, 0, 0, getattr(os, advice_name))
+    except OSError:
+        pass
+
+def _hash_file(file_path: Path) -> Optional[str]:
     """
-    计算文件的MD5哈希值。
-    参数:
-        file_path: 文件的 Path 对象。
-    返回:
-        文件的MD5哈希字符串，如果文件不存在或读取错误则返回 None。
+    计算文件内容的MD5十六进制摘要。大文件整体映射后一次计算，其余文件按 1MB 分块读入复用的缓冲区。
+    文件不存在或读取错误时返回 None。
     """
     if not file_path.is_file():
         logger.warning(f"请求计算MD5的文件不是一个有效文件: {file_path}")
         return None
-    hash_md5 = hashlib.md5()
     try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""): # 每次读取 4KB
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        file_hash = hashlib.md5()
+        with open(file_path, "rb", buffering=0) as f: # 自行分块读取，不需要额外的缓冲层
+            large = os.fstat(f.fileno()).st_size >= _HASH_MMAP_MIN_BYTES
+            _fadvise(f.fileno(), "POSIX_FADV_SEQUENTIAL")
+            try:
+                if large:
+                    try:
+                        # 单次 update 让 OpenSSL 在一个调用内完成整个文件 (期间释放 GIL)，没有逐块的 Python 往返
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            if _MADV_SEQUENTIAL is not None:
+                                mm.madvise(_MADV_SEQUENTIAL)
+                            file_hash.update(mm)
+                        return file_hash.hexdigest()
+                    except (OSError, ValueError) as e: # 无法映射 (特殊文件系统、stat 后文件被截断为空等)，回退到按块读取
+                        logger.debug(f"文件 {file_path} 无法通过 mmap 读取，改为按块读取: {e}")
+                        file_hash = hashlib.md5()
+                        f.seek(0)
+                # 每次读取 1MB 到同一个缓冲区，避免逐块分配新的 bytes 对象；update 直接接受 memoryview 切片
+                buf = bytearray(_HASH_CHUNK)
+                with memoryview(buf) as view:
+                    while n := f.readinto(buf):
+                        file_hash.update(view[:n])
+            finally:
+                if large:
+                    _fadvise(f.fileno(), "POSIX_FADV_DONTNEED")
+        return file_hash.hexdigest()
     except IOError as e:
         logger.error(f"无法读取文件 {file_path} 以计算MD5: {e}")
         return None
@@ -109,6 +334,40 @@ def calculate_md5(file_path: Path) -> Optional[str]:
         logger.error(f"计算文件 {file_path} MD5时发生未知错误: {e}")
         return None
 
+class _HashFailed(Exception):
+    """摘要计算失败 (已记录日志)。以异常退出，使失败结果不进入 lru_cache。"""
+
+@lru_cache(maxsize=4096)
+def _hash_file_cached(path_str: str, size: int, mtime_ns: int, ctime_ns: int, inode: int) -> str:
+    """按 (路径, 大小, 修改时间, 状态变更时间, inode) 缓存摘要；文件内容变化时这些键至少有一个会变。"""
+    digest = _hash_file(Path(path_str))
+    if digest is None:
+        raise _HashFailed(path_str)
+    return digest
+
+def calculate_md5(file_path: Path) -> Optional[str]:
+    """
+    计算文件的MD5哈希值。
+    未变化的文件直接返回缓存的摘要，避免重复读取整个文件。
+    参数:
+        file_path: 文件的 Path 对象。
+    返回:
+        文件的MD5哈希字符串，如果文件不存在或读取错误则返回 None。
+    """
+    try:
+        st = file_path.stat()
+    except OSError:
+        return _hash_file(file_path) # 由 _hash_file 记录日志
+    if not stat.S_ISREG(st.st_mode):
+        return _hash_file(file_path)
+    try:
+        return _hash_file_cached(str(file_path), st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino)
+    except _HashFailed:
+        return None
+
+
+# 去除空白用的转换表：非断行空格、普通空格、制表符、显式换行符，一次 translate 在 C 层单遍完成
+_WS_TABLE = str.maketrans("", "", "\u00A0 \t\n")
 
 # def remove_whitespace_from_docx(path: str):
 #     '''
@@ -117,10 +376,10 @@ def calculate_md5(file_path: Path) -> Optional[str]:
 #     doc = Document(path)
 #     for para in doc.paragraphs:
 #         for run in para.runs:
-#             run.text = run.text.replace('\u00A0', '')  # 非断行空格
-#             run.text = run.text.replace(' ', '')       # 普通空格
-#             run.text = run.text.replace('\t', '')      # 制表符
-#             run.text = run.text.replace('\n', '')      # 显式换行符
+#             text = run.text
+#             stripped = text.translate(_WS_TABLE)
+#             if stripped != text: # 没有变化时不回写，避免重建 run 的 XML
+#                 run.text = stripped
 
 #     doc.save(path)
 
@@ -143,10 +402,75 @@ def calculate_md5(file_path: Path) -> Optional[str]:
 
 #     new_doc.save(path)
 
+# paragraph.text 只由段落直属 run 与超链接内 run 的内容组成，其中能产生非空白字符的只有 w:t 与 w:noBreakHyphen ("-")；
+# 制表符、换行等其余内容 strip() 后均为空
+_PARA_VISIBLE_XPATH = etree.XPath(
+    "w:r/w:t|w:r/w:noBreakHyphen|w:hyperlink/w:r/w:t|w:hyperlink/w:r/w:noBreakHyphen",
+    namespaces={"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"},
+)
+_W_T = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}t"
+_W_P = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}p"
+_W_BODY = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}body"
+_DOCX_MAIN_PART = "word/document.xml"
+# 与 python-docx 一致，不解析外部实体
+_DOCX_XML_PARSER = etree.XMLParser(resolve_entities=False)
+
+def _is_blank_paragraph(p) -> bool:
+    """等价于 len(paragraph.text.strip()) == 0，但直接检查 XML，遇到第一个可见字符即返回。"""
+    for node in _PARA_VISIBLE_XPATH(p):
+        if node.tag != _W_T:
+            return False
+        text = node.text
+        if text and not text.isspace():
+            return False
+    return True
+
+def _drop_paragraphs(parent, paragraphs) -> None:
+    """一次性从父元素中移除给定段落：整体重设一次子节点，避免逐个 remove 反复调整兄弟链表。"""
+    drop_ids = {id(p) for p in paragraphs}
+    parent[:] = [child for child in parent if id(child) not in drop_ids]
+
+def _strip_empty_paragraphs_xml(document_xml: bytes) -> Optional[bytes]:
+    """
+    从 word/document.xml 的内容中移除正文的空段落，不加载 python-docx 的完整文档模型。
+    返回改写后的 XML；没有空段落时返回 None。XML 无法解析时抛出异常。
+    """
+    root = etree.fromstring(document_xml, _DOCX_XML_PARSER)
+    body = root.find(_W_BODY)
+    if body is None:
+        return None
+    paragraphs_to_delete = [p for p in body.iterchildren(_W_P) if _is_blank_paragraph(p)]
+    if not paragraphs_to_delete:
+        return None
+    _drop_paragraphs(body, paragraphs_to_delete)
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+def _write_docx_copy(doc_path, docx_zip: zipfile.ZipFile, document_xml: bytes) -> str:
+    """
+    将替换了 word/document.xml 的文档写入同目录的临时文件 (其余部件逐个原样复制)，
+    返回其路径，由调用方原子替换原文件。失败时删除临时文件并抛出异常。
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=".docx", dir=os.path.dirname(os.path.abspath(doc_path)))
+    try:
+        with os.fdopen(fd, "wb") as tmp_file, zipfile.ZipFile(tmp_file, "w") as out_zip:
+            for info in docx_zip.infolist():
+                out_info = copy.copy(info) # 写入时会改写偏移与校验信息，不要动源压缩包的 ZipInfo
+                if info.filename == _DOCX_MAIN_PART:
+                    out_zip.writestr(out_info, document_xml)
+                    continue
+                with docx_zip.open(info) as src, out_zip.open(out_info, "w") as dst:
+                    shutil.copyfileobj(src, dst, 1 << 20)
+        shutil.copymode(doc_path, tmp_path) # mkstemp 创建的文件权限为 0600，保持原文件权限
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path
+
 def remove_empty_paragraphs(doc_path):
     """
     从 .docx 文件中移除空段落和仅包含空白字符的段落。
-    此函数会同时处理文档正文和表格单元格中的段落。
+    只处理文档正文中的段落 (与 python-docx 的 doc.paragraphs 相同)，表格单元格中的段落保持不变。
+    主文档部件位于 word/document.xml 时直接改写该 XML，否则回退到 python-docx。
 
     :param doc_path: 原始 .docx 文件的路径。
     :param new_doc_path: (可选) 清理后新文档的保存路径。
@@ -154,13 +478,6 @@ def remove_empty_paragraphs(doc_path):
                          例如 "原文件名_cleaned.docx"。
     """
     
-    # 内部辅助函数，用于删除段落的 XML 元素
-    def _delete_paragraph(paragraph):
-        p = paragraph._element
-        p.getparent().remove(p)
-        # 将段落对象的内部引用设为 None，是一种好的编程习惯
-        paragraph._p = paragraph._element = None
-
     # 检查文件是否存在
     # if not os.path.exists(doc_path):
     #     print(f"错误：文件 '{doc_path}' 不存在。")
@@ -171,6 +488,30 @@ def remove_empty_paragraphs(doc_path):
     #     base, ext = os.path.splitext(doc_path)
     #     new_doc_path = f"{base}_cleaned{ext}"
 
+    # 文件损坏、XML 无法解析等错误与 python-docx 路径一样直接抛给调用方；只有写入/替换失败记录日志
+    fast_path = False
+    tmp_path = None
+    if zipfile.is_zipfile(doc_path):
+        with zipfile.ZipFile(doc_path) as docx_zip:
+            fast_path = _DOCX_MAIN_PART in docx_zip.namelist()
+            if fast_path:
+                document_xml = _strip_empty_paragraphs_xml(docx_zip.read(_DOCX_MAIN_PART))
+                if document_xml is not None:
+                    try:
+                        tmp_path = _write_docx_copy(doc_path, docx_zip, document_xml)
+                    except OSError as e:
+                        logger.error(f"保存文件 {doc_path} 时出错：{e}")
+                        return
+    if fast_path:
+        # 关闭原压缩包后再替换，兼容不允许替换已打开文件的平台
+        if tmp_path:
+            try:
+                os.replace(tmp_path, doc_path)
+            except OSError as e:
+                os.remove(tmp_path)
+                logger.error(f"保存文件 {doc_path} 时出错：{e}")
+        return
+
     doc = Document(doc_path)
 
     # --- 步骤 1: 识别所有待删除的段落 ---
@@ -179,14 +520,22 @@ def remove_empty_paragraphs(doc_path):
     
     # 遍历正文段落
     for paragraph in doc.paragraphs:
-        # 如果段落去除首尾空白后长度为0，则判定为空
-        if len(paragraph.text.strip()) == 0:
+        # 如果段落去除首尾空白后长度为0，则判定为空 (直接检查 XML，不拼接 paragraph.text)
+        if _is_blank_paragraph(paragraph._element):
             paragraphs_to_delete.append(paragraph)
 
     # --- 步骤 2: 一次性删除所有已识别的段落 ---
-    # 在一个单独的循环中执行删除操作，避免在遍历时修改集合
-    for p in paragraphs_to_delete:
-        _delete_paragraph(p)
+    # 按父元素分组，每个父元素只整体重设一次子节点
+    drop_by_parent = {}
+    for paragraph in paragraphs_to_delete:
+        p = paragraph._element
+        parent = p.getparent()
+        drop_by_parent.setdefault(id(parent), (parent, []))[1].append(p)
+    for parent, paragraphs in drop_by_parent.values():
+        _drop_paragraphs(parent, paragraphs)
+    for paragraph in paragraphs_to_delete:
+        # 将段落对象的内部引用设为 None，是一种好的编程习惯
+        paragraph._p = paragraph._element = None
 
     # --- 步骤 3: 保存清理后的文档 ---
     try:
@@ -194,4 +543,4 @@ def remove_empty_paragraphs(doc_path):
         # print(f"成功！已移除 {len(paragraphs_to_delete)} 个空段落。")
         # print(f"清理后的文档已保存至：{new_doc_path}")
     except Exception as e:
-        print(f"保存文件时出错：{e}")
\ No newline at end of file
+        logger.error(f"保存文件 {doc_path} 时出错：{e}")
\ No newline at end of file